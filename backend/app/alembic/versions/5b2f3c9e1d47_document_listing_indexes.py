@@ -0,0 +1,36 @@
+"""document listing indexes
+
+Revision ID: 5b2f3c9e1d47
+Revises: 04947f9684ab
+Create Date: 2026-10-16 10:12:37.512841
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5b2f3c9e1d47"
+down_revision = "04947f9684ab"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_documents_kb_id_updated_at",
+        "documents",
+        ["knowledge_base_id", "updated_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_documents_ds_id_updated_at",
+        "documents",
+        ["data_source_id", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_documents_ds_id_updated_at", table_name="documents")
+    op.drop_index("ix_documents_kb_id_updated_at", table_name="documents")
@@ -0,0 +1,29 @@
+"""chat engine default index
+
+Revision ID: 9c1e7a4d2f60
+Revises: 5b2f3c9e1d47
+Create Date: 2026-10-16 11:03:52.118406
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9c1e7a4d2f60"
+down_revision = "5b2f3c9e1d47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_chat_engines_is_default_deleted_at",
+        "chat_engines",
+        ["is_default", "deleted_at"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_chat_engines_is_default_deleted_at", table_name="chat_engines")
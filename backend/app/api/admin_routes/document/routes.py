@@ -9,6 +9,7 @@ from app.api.admin_routes.knowledge_base.document.models import (
 )
 from app.api.deps import SessionDep, CurrentSuperuserDep
 from app.repositories import document_repo
+from app.repositories.base_repo import CursorPage, CursorParams
 
 router = APIRouter()
 
@@ -25,3 +26,17 @@ def list_documents(
         filters=filters,
         params=params,
     )
+
+
+@router.get("/admin/documents/cursor")
+def list_documents_by_cursor(
+    session: SessionDep,
+    user: CurrentSuperuserDep,
+    filters: Annotated[DocumentFilters, Query()],
+    params: Annotated[CursorParams, Query()],
+) -> CursorPage[DocumentItem]:
+    return document_repo.paginate(
+        session=session,
+        filters=filters,
+        params=params,
+    )
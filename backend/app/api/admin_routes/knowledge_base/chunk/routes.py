@@ -2,6 +2,7 @@ import logging
 
 from fastapi import APIRouter
 from app.api.deps import SessionDep, CurrentSuperuserDep
+from app.core.db import read_session_factory
 from app.rag.retrievers.chunk.simple_retriever import (
     ChunkSimpleRetriever,
 )
@@ -27,6 +28,7 @@ def retrieve_chunks(
             db_session=db_session,
             knowledge_base_id=kb_id,
             config=vector_search_config,
+            read_session_factory=read_session_factory,
         )
         return retriever.retrieve_chunks(
             request.query,
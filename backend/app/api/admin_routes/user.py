@@ -1,7 +1,8 @@
-from typing import Optional
-from fastapi import APIRouter, Depends
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query
 from fastapi_pagination import Page, Params
 
+from app.repositories.base_repo import CursorPage, IdCursorParams
 from app.repositories.user import user_repo
 from app.api.deps import SessionDep, CurrentSuperuserDep
 from app.api.admin_routes.models import (
@@ -19,6 +20,18 @@ def search_users(
     db_session: SessionDep,
     user: CurrentSuperuserDep,
     search: Optional[str] = None,
+    contains: bool = False,
     params: Params = Depends(),
 ) -> Page[UserDescriptor]:
-    return user_repo.search_users(db_session, search, params)
+    return user_repo.search_users(db_session, search, params, contains)
+
+
+@router.get("/search/cursor")
+def search_users_by_cursor(
+    db_session: SessionDep,
+    user: CurrentSuperuserDep,
+    params: Annotated[IdCursorParams, Query()],
+    search: Optional[str] = None,
+    contains: bool = False,
+) -> CursorPage[UserDescriptor]:
+    return user_repo.search_users(db_session, search, params, contains)
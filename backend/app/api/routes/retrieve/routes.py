@@ -2,6 +2,7 @@ import logging
 
 from fastapi import APIRouter
 from app.api.deps import SessionDep, CurrentSuperuserDep
+from app.core.db import read_session_factory
 from app.rag.retrievers.knowledge_graph.fusion_retriever import (
     KnowledgeGraphFusionRetriever,
 )
@@ -35,6 +36,9 @@ def retrieve_chunks(
             llm=llm,
             use_query_decompose=config.use_query_decompose,
             config=config.vector_search,
+            read_session_factory=read_session_factory,
+            semantic_cache_config=config.semantic_cache,
+            max_concurrency=config.max_concurrent_retrievals,
         )
         return retriever.retrieve_chunks(request.query, config.full_documents)
     except KBNotFound as e:
@@ -59,6 +63,8 @@ def retrieve_knowledge_graph(
             llm=llm,
             use_query_decompose=config.use_query_decompose,
             config=config.knowledge_graph,
+            semantic_cache_config=config.semantic_cache,
+            max_concurrency=config.max_concurrent_retrievals,
         )
         return retriever.retrieve_knowledge_graph(request.query)
     except KBNotFound as e:
@@ -86,6 +86,10 @@ class Settings(BaseSettings):
     TIDB_DATABASE: str
     TIDB_SSL: bool = True
 
+    # Optional read replica, used to offload read-only lookups from the primary.
+    TIDB_READ_REPLICA_HOST: str | None = None
+    TIDB_READ_REPLICA_PORT: int | None = None
+
     ENABLE_QUESTION_CACHE: bool = False
 
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
@@ -122,6 +126,23 @@ class Settings(BaseSettings):
             else None,
         )
 
+    @computed_field  # type: ignore[misc]
+    @property
+    def SQLALCHEMY_READ_REPLICA_DATABASE_URI(self) -> MySQLDsn | None:
+        if not self.TIDB_READ_REPLICA_HOST:
+            return None
+        return MultiHostUrl.build(
+            scheme="mysql+pymysql",
+            username=self.TIDB_USER,
+            password=quote(self.TIDB_PASSWORD),
+            host=self.TIDB_READ_REPLICA_HOST,
+            port=self.TIDB_READ_REPLICA_PORT or self.TIDB_PORT,
+            path=self.TIDB_DATABASE,
+            query="ssl_verify_cert=true&ssl_verify_identity=true"
+            if self.TIDB_SSL
+            else None,
+        )
+
     @computed_field  # type: ignore[misc]
     @property
     def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> MySQLDsn:
@@ -1,6 +1,6 @@
 import ssl
 import contextlib
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Callable, Generator, Optional
 
 from sqlmodel import create_engine, Session
 from sqlalchemy import event
@@ -24,6 +24,27 @@ engine = create_engine(
 # create a scoped session, ensure in multi-threading environment, each thread has its own session
 Scoped_Session = scoped_session(sessionmaker(bind=engine, class_=Session))
 
+# The read replica engine is optional, read-only lookups fall back to the
+# primary engine's session if it is not configured.
+read_engine = (
+    create_engine(
+        str(settings.SQLALCHEMY_READ_REPLICA_DATABASE_URI),
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=300,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+    )
+    if settings.SQLALCHEMY_READ_REPLICA_DATABASE_URI
+    else None
+)
+
+read_session_factory: Optional[Callable[[], Session]] = (
+    sessionmaker(bind=read_engine, class_=Session, expire_on_commit=False)
+    if read_engine is not None
+    else None
+)
+
 
 def get_ssl_context():
     ssl_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
@@ -55,6 +76,8 @@ def prepare_db_connection(dbapi_connection, connection_record):
 
 event.listen(engine, "connect", prepare_db_connection)
 event.listen(async_engine.sync_engine, "connect", prepare_db_connection)
+if read_engine is not None:
+    event.listen(read_engine, "connect", prepare_db_connection)
 
 
 def get_db_session() -> Generator[Session, None, None]:
@@ -7,6 +7,7 @@ from sqlmodel import (
     Column,
     JSON,
     DateTime,
+    Index,
     Relationship as SQLRelationship,
 )
 
@@ -40,6 +41,9 @@ class ChatEngine(UpdatableBaseModel, table=True):
     deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime))
 
     __tablename__ = "chat_engines"
+    __table_args__ = (
+        Index("ix_chat_engines_is_default_deleted_at", "is_default", "deleted_at"),
+    )
 
 
 class ChatEngineUpdate(BaseModel):
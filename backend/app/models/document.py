@@ -12,6 +12,7 @@ from sqlmodel import (
     DateTime,
     JSON,
     String,
+    Index,
     Relationship as SQLRelationship,
 )
 
@@ -69,6 +70,12 @@ class Document(UpdatableBaseModel, table=True):
     )
 
     __tablename__ = "documents"
+    # Cover the document listing, which filters by knowledge base or data source
+    # and sorts by updated_at, to avoid a filesort over the whole table.
+    __table_args__ = (
+        Index("ix_documents_kb_id_updated_at", "knowledge_base_id", "updated_at"),
+        Index("ix_documents_ds_id_updated_at", "data_source_id", "updated_at"),
+    )
 
     def to_llama_document(self) -> LlamaDocument:
         return LlamaDocument(
@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 from typing import List, Optional, Type
 
 from llama_index.core import VectorStoreIndex
@@ -30,6 +31,22 @@ from app.rag.llms.dspy import get_dspy_lm_by_llama_llm
 
 logger = logging.getLogger(__name__)
 
+_SPLITTERS = {
+    ChunkSplitter.MARKDOWN_NODE_PARSER: (MarkdownNodeParser, MarkdownNodeParserOptions),
+    ChunkSplitter.SENTENCE_SPLITTER: (SentenceSplitter, SentenceSplitterOptions),
+}
+
+
+@lru_cache(maxsize=64)
+def _get_text_splitter(
+    splitter: ChunkSplitter, options_json: str
+) -> TransformComponent:
+    # Building a splitter loads the tokenizer, so share it between the documents
+    # chunked with the same options, the splitters keep no state between calls.
+    splitter_cls, options_cls = _SPLITTERS[splitter]
+    options = options_cls.model_validate_json(options_json)
+    return splitter_cls(**options.model_dump())
+
 
 class IndexService:
     """
@@ -120,17 +137,14 @@ class IndexService:
             )
 
         rule = rules[mime_type]
-        match rule.splitter:
-            case ChunkSplitter.MARKDOWN_NODE_PARSER:
-                options = MarkdownNodeParserOptions.model_validate(
-                    rule.splitter_options
-                )
-                transformations.append(MarkdownNodeParser(**options.model_dump()))
-            case ChunkSplitter.SENTENCE_SPLITTER:
-                options = SentenceSplitterOptions.model_validate(rule.splitter_options)
-                transformations.append(SentenceSplitter(**options.model_dump()))
-            case _:
-                raise ValueError(f"Unsupported chunking splitter type: {rule.splitter}")
+        if rule.splitter not in _SPLITTERS:
+            raise ValueError(f"Unsupported chunking splitter type: {rule.splitter}")
+
+        _, options_cls = _SPLITTERS[rule.splitter]
+        options = options_cls.model_validate(rule.splitter_options)
+        transformations.append(
+            _get_text_splitter(rule.splitter, options.model_dump_json())
+        )
 
         return transformations
 
@@ -11,7 +11,6 @@ from langfuse.llama_index._context import langfuse_instrumentor_context
 from llama_index.core import get_response_synthesizer
 from llama_index.core.base.llms.types import ChatMessage, MessageRole
 from llama_index.core.schema import NodeWithScore
-from llama_index.core.prompts.rich import RichPromptTemplate
 
 from sqlmodel import Session
 from app.core.config import settings
@@ -32,7 +31,11 @@ from app.rag.chat.stream_protocol import (
 from app.rag.llms.dspy import get_dspy_lm_by_llama_llm
 from app.rag.retrievers.knowledge_graph.schema import KnowledgeGraphRetrievalResult
 from app.rag.types import ChatEventType, ChatMessageSate
-from app.rag.utils import parse_goal_response_format
+from app.rag.utils import (
+    get_current_date_str,
+    get_prompt_template,
+    parse_goal_response_format,
+)
 from app.repositories import chat_repo
 from app.site_settings import SiteSetting
 from app.utils.tracing import LangfuseContextManager
@@ -356,13 +359,13 @@ class ChatFlow:
                     ),
                 )
 
-            prompt_template = RichPromptTemplate(refined_question_prompt)
+            prompt_template = get_prompt_template(refined_question_prompt)
             refined_question = self._fast_llm.predict(
                 prompt_template,
                 graph_knowledges=knowledge_graph_context,
                 chat_history=chat_history,
                 question=user_question,
-                current_date=datetime.now().strftime("%Y-%m-%d"),
+                current_date=get_current_date_str(),
             )
 
             if not annotation_silent:
@@ -403,7 +406,7 @@ class ChatFlow:
                 "knowledge_graph_context": knowledge_graph_context,
             },
         ) as span:
-            prompt_template = RichPromptTemplate(
+            prompt_template = get_prompt_template(
                 self.engine_config.llm.clarifying_question_prompt
             )
 
@@ -467,11 +470,10 @@ class ChatFlow:
             name="generate_answer", input=user_question
         ) as span:
             # Initialize response synthesizer.
-            text_qa_template = RichPromptTemplate(
-                template_str=self.engine_config.llm.text_qa_prompt
-            )
-            text_qa_template = text_qa_template.partial_format(
-                current_date=datetime.now().strftime("%Y-%m-%d"),
+            text_qa_template = get_prompt_template(
+                self.engine_config.llm.text_qa_prompt
+            ).partial_format(
+                current_date=get_current_date_str(),
                 graph_knowledges=knowledge_graph_context,
                 original_question=self.user_question,
             )
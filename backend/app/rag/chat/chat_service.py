@@ -6,8 +6,8 @@ from uuid import UUID
 
 from fastapi import HTTPException
 from pydantic import BaseModel
-from sqlalchemy import text, delete
-from sqlmodel import Session, select, func
+from sqlalchemy import text, delete, exists
+from sqlmodel import Session, select
 
 from app.api.routes.models import (
     RequiredConfigStatus,
@@ -37,6 +37,7 @@ from app.repositories import knowledge_base_repo
 from app.rag.chat.config import (
     ChatEngineConfig,
 )
+from app.rag.utils import get_prompt_template
 from app.rag.types import (
     ChatEventType,
     ChatMessageSate,
@@ -45,7 +46,6 @@ from app.repositories import chat_engine_repo
 from app.repositories.embedding_model import embedding_model_repo
 from app.repositories.llm import llm_repo
 from app.site_settings import SiteSetting
-from llama_index.core.prompts.rich import RichPromptTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -211,7 +211,7 @@ def check_rag_required_config(session: Session) -> RequiredConfigStatus:
     has_default_llm = llm_repo.has_default(session)
     has_default_embedding_model = embedding_model_repo.has_default(session)
     has_default_chat_engine = chat_engine_repo.has_default(session)
-    has_knowledge_base = session.scalar(select(func.count(DBKnowledgeBase.id))) > 0
+    has_knowledge_base = session.scalar(select(exists().select_from(DBKnowledgeBase)))
 
     return RequiredConfigStatus(
         default_llm=has_default_llm,
@@ -227,7 +227,7 @@ def check_rag_optional_config(session: Session) -> OptionalConfigStatus:
         and SiteSetting.langfuse_secret_key
         and SiteSetting.langfuse_public_key
     )
-    default_reranker = session.scalar(select(func.count(DBRerankerModel.id))) > 0
+    default_reranker = session.scalar(select(exists().select_from(DBRerankerModel)))
     return OptionalConfigStatus(
         langfuse=langfuse,
         default_reranker=default_reranker,
@@ -283,7 +283,7 @@ def get_chat_message_recommend_questions(
     if questions is not None:
         return questions
 
-    prompt_template = RichPromptTemplate(
+    prompt_template = get_prompt_template(
         chat_engine_config.llm.further_questions_prompt
     )
     recommend_questions = llm.predict(
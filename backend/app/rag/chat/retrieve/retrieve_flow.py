@@ -1,14 +1,13 @@
 import logging
-from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from llama_index.core.instrumentation import get_dispatcher
 from llama_index.core.llms import LLM
 from llama_index.core.schema import NodeWithScore, QueryBundle
-from llama_index.core.prompts.rich import RichPromptTemplate
 from pydantic import BaseModel
 from sqlmodel import Session
 
+from app.core.db import read_session_factory as default_read_session_factory
 from app.models import (
     Document as DBDocument,
     KnowledgeBase,
@@ -22,7 +21,8 @@ from app.rag.retrievers.knowledge_graph.schema import (
     KnowledgeGraphRetrieverConfig,
 )
 from app.rag.retrievers.chunk.fusion_retriever import ChunkFusionRetriever
-from app.repositories import document_repo
+from app.rag.retrievers.chunk.helpers import fetch_documents_by_ids
+from app.rag.utils import get_current_date_str, get_prompt_template
 
 dispatcher = get_dispatcher(__name__)
 logger = logging.getLogger(__name__)
@@ -43,8 +43,14 @@ class RetrieveFlow:
         llm: Optional[LLM] = None,
         fast_llm: Optional[LLM] = None,
         knowledge_bases: Optional[List[KnowledgeBase]] = None,
+        read_session_factory: Optional[
+            Callable[[], Session]
+        ] = default_read_session_factory,
     ):
         self.db_session = db_session
+        # The documents of the retrieved chunks are read from the read replica if
+        # it is configured, which is None otherwise.
+        self._read_session_factory = read_session_factory
         self.engine_name = engine_name
         self.engine_config = engine_config or ChatEngineConfig.load_from_db(
             db_session, engine_name
@@ -66,7 +72,12 @@ class RetrieveFlow:
     def retrieve(self, user_question: str) -> List[NodeWithScore]:
         if self.engine_config.refine_question_with_kg:
             # 1. Retrieve Knowledge graph related to the user question.
-            _, knowledge_graph_context = self.search_knowledge_graph(user_question)
+            # The graph itself is discarded here, so the subgraphs are only
+            # needed to render the intent search context.
+            _, knowledge_graph_context = self.search_knowledge_graph(
+                user_question,
+                include_subgraphs=self.engine_config.knowledge_graph.using_intent_search,
+            )
 
             # 2. Refine the user question using knowledge graph and chat history.
             self._refine_user_question(user_question, knowledge_graph_context)
@@ -79,20 +90,24 @@ class RetrieveFlow:
         return self.get_documents_from_nodes(nodes)
 
     def search_knowledge_graph(
-        self, user_question: str
+        self, user_question: str, include_subgraphs: Optional[bool] = None
     ) -> Tuple[KnowledgeGraphRetrievalResult, str]:
         kg_config = self.engine_config.knowledge_graph
         knowledge_graph = KnowledgeGraphRetrievalResult()
         knowledge_graph_context = ""
         if kg_config is not None and kg_config.enabled:
+            kg_retriever_config = KnowledgeGraphRetrieverConfig.model_validate(
+                kg_config.model_dump(exclude={"enabled", "using_intent_search"})
+            )
+            if include_subgraphs is not None:
+                kg_retriever_config.include_subgraphs = include_subgraphs
             kg_retriever = KnowledgeGraphFusionRetriever(
                 db_session=self.db_session,
-                knowledge_base_ids=[kb.id for kb in self.knowledge_bases],
+                knowledge_base_ids=self.knowledge_base_ids,
+                knowledge_bases=self.knowledge_bases,
                 llm=self._llm,
                 use_query_decompose=kg_config.using_intent_search,
-                config=KnowledgeGraphRetrieverConfig.model_validate(
-                    kg_config.model_dump(exclude={"enabled", "using_intent_search"})
-                ),
+                config=kg_retriever_config,
             )
             knowledge_graph = kg_retriever.retrieve_knowledge_graph(user_question)
             knowledge_graph_context = self._get_knowledge_graph_context(knowledge_graph)
@@ -102,14 +117,14 @@ class RetrieveFlow:
         self, knowledge_graph: KnowledgeGraphRetrievalResult
     ) -> str:
         if self.engine_config.knowledge_graph.using_intent_search:
-            kg_context_template = RichPromptTemplate(
+            kg_context_template = get_prompt_template(
                 self.engine_config.llm.intent_graph_knowledge
             )
             return kg_context_template.format(
                 sub_queries=knowledge_graph.to_subqueries_dict(),
             )
         else:
-            kg_context_template = RichPromptTemplate(
+            kg_context_template = get_prompt_template(
                 self.engine_config.llm.normal_graph_knowledge
             )
             return kg_context_template.format(
@@ -120,14 +135,14 @@ class RetrieveFlow:
     def _refine_user_question(
         self, user_question: str, knowledge_graph_context: str
     ) -> str:
-        prompt_template = RichPromptTemplate(
+        prompt_template = get_prompt_template(
             self.engine_config.llm.condense_question_prompt
         )
         refined_question = self._fast_llm.predict(
             prompt_template,
             graph_knowledges=knowledge_graph_context,
             question=user_question,
-            current_date=datetime.now().strftime("%Y-%m-%d"),
+            current_date=get_current_date_str(),
         )
         return refined_question.strip().strip(".\"'!")
 
@@ -135,15 +150,19 @@ class RetrieveFlow:
         retriever = ChunkFusionRetriever(
             db_session=self.db_session,
             knowledge_base_ids=self.knowledge_base_ids,
+            knowledge_bases=self.knowledge_bases,
             llm=self._llm,
             config=self.engine_config.vector_search,
             use_query_decompose=False,
+            read_session_factory=self._read_session_factory,
         )
         return retriever.retrieve(QueryBundle(user_question))
 
     def get_documents_from_nodes(self, nodes: List[NodeWithScore]) -> List[DBDocument]:
         document_ids = [n.node.metadata["document_id"] for n in nodes]
-        documents = document_repo.fetch_by_ids(self.db_session, document_ids)
+        documents = fetch_documents_by_ids(
+            self.db_session, document_ids, self._read_session_factory
+        )
         # Keep the original order of document ids, which is sorted by similarity.
         return sorted(documents, key=lambda x: document_ids.index(x.id))
 
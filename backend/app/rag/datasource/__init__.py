@@ -4,9 +4,6 @@ from uuid import UUID
 
 from app.models import DataSourceType
 from .base import BaseDataSource
-from .file import FileDataSource
-from .web_sitemap import WebSitemapDataSource
-from .web_single_page import WebSinglePageDataSource
 
 
 def get_data_source_loader(
@@ -19,12 +16,21 @@ def get_data_source_loader(
 ) -> BaseDataSource:
     data_source_cls = None
 
+    # Import the data sources lazily, they pull in the heavy parsing and browser
+    # libraries (pypdf, openpyxl, playwright, ...), which most processes importing
+    # this package never use.
     match data_source_type:
         case DataSourceType.FILE:
+            from .file import FileDataSource
+
             data_source_cls = FileDataSource
         case DataSourceType.WEB_SITEMAP:
+            from .web_sitemap import WebSitemapDataSource
+
             data_source_cls = WebSitemapDataSource
         case DataSourceType.WEB_SINGLE_PAGE:
+            from .web_single_page import WebSinglePageDataSource
+
             data_source_cls = WebSinglePageDataSource
         case _:
             raise ValueError("Data source type not supported")
@@ -1,3 +1,4 @@
+import hashlib
 from abc import ABC, abstractmethod
 from uuid import UUID
 from typing import Generator, Any
@@ -6,6 +7,16 @@ from sqlmodel import Session
 from app.models import Document
 
 
+def content_hash(content: str | bytes) -> str:
+    """
+    Returns the hex digest of the document content, which fits the 32 chars hash
+    column and, unlike the built-in hash(), is stable across processes.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
 class BaseDataSource(ABC):
     session: Session
     knowledge_base_id: int
@@ -5,11 +5,12 @@ import openpyxl
 from pydantic import BaseModel
 from typing import Generator, IO
 from pypdf import PdfReader
+from sqlmodel import select
 
 from app.models import Document, Upload
 from app.file_storage import default_file_storage
 from app.types import MimeTypes
-from .base import BaseDataSource
+from .base import BaseDataSource, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +27,17 @@ class FileDataSource(BaseDataSource):
             FileConfig.model_validate(f_config)
 
     def load_documents(self) -> Generator[Document, None, None]:
-        for f_config in self.config:
-            upload_id = f_config["file_id"]
-            upload = self.session.get(Upload, upload_id)
+        # Load all the uploads in one query instead of one query per file.
+        upload_ids = [f_config["file_id"] for f_config in self.config]
+        uploads = {
+            upload.id: upload
+            for upload in self.session.exec(
+                select(Upload).where(Upload.id.in_(upload_ids))
+            )
+        }
+
+        for upload_id in upload_ids:
+            upload = uploads.get(upload_id)
             if upload is None:
                 logger.error(f"Upload with id {upload_id} not found")
                 continue
@@ -55,7 +64,7 @@ class FileDataSource(BaseDataSource):
 
             document = Document(
                 name=upload.name,
-                hash=hash(content),
+                hash=content_hash(content),
                 content=content,
                 mime_type=mime_type,
                 knowledge_base_id=self.knowledge_base_id,
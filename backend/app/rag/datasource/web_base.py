@@ -1,53 +1,115 @@
+import asyncio
 import logging
 from datetime import datetime, UTC
-from typing import Generator
-from playwright.sync_api import sync_playwright
+from typing import AsyncGenerator, Generator, Optional, Tuple
+from playwright.async_api import async_playwright, BrowserContext
 from bs4 import BeautifulSoup
 from markdownify import MarkdownConverter
 
 from app.models import Document
+from app.rag.datasource.base import content_hash
 from app.rag.datasource.consts import IGNORE_TAGS, IGNORE_CLASSES
 
 logger = logging.getLogger(__name__)
 
+# The max number of pages loaded by the browser at the same time.
+MAX_CONCURRENT_PAGES = 8
+
+_IGNORE_SELECTOR = ", ".join(IGNORE_TAGS + [f".{c}" for c in IGNORE_CLASSES])
+
+# The converter keeps no state between conversions, so it is shared by all pages.
+_markdown_converter = MarkdownConverter()
+
 
 def load_web_documents(
     knowledge_base_id: int, data_source_id: int, urls: list[str]
 ) -> Generator[Document, None, None]:
+    # Drive the async loader on a private event loop, the pages keep loading in
+    # the background whenever the loop runs to fetch the next document.
+    loop = asyncio.new_event_loop()
+    documents = _aload_web_documents(knowledge_base_id, data_source_id, urls)
+    try:
+        while True:
+            try:
+                document = loop.run_until_complete(documents.__anext__())
+            except StopAsyncIteration:
+                break
+            yield document
+    finally:
+        loop.run_until_complete(documents.aclose())
+        loop.close()
+
+
+async def _aload_web_documents(
+    knowledge_base_id: int, data_source_id: int, urls: list[str]
+) -> AsyncGenerator[Document, None]:
     visited = set()
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        for url in urls:
-            page = browser.new_page()
-            response = page.goto(url)
-            final_url = page.url
-            if final_url in visited:
-                continue
-
-            if response.status >= 400:
-                logger.error(
-                    f"Failed to load page: {url}, response status: {response.status()}, skipping"
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        # Share one context between the pages, browser.new_page() would create a
+        # new context for every page.
+        context = await browser.new_context()
+
+        async def load_page(url: str):
+            async with semaphore:
+                return await _aload_web_page(context, url)
+
+        # Skip the duplicated urls before loading them, the final urls after the
+        # redirects are still checked against the visited ones below.
+        tasks = [asyncio.ensure_future(load_page(url)) for url in dict.fromkeys(urls)]
+        try:
+            # Yield the documents in the order the pages finish loading.
+            for next_page in asyncio.as_completed(tasks):
+                loaded = await next_page
+                if loaded is None:
+                    continue
+
+                final_url, title, html = loaded
+                if final_url in visited:
+                    continue
+                visited.add(final_url)
+
+                content = html_to_markdown(html)
+                yield Document(
+                    name=title,
+                    hash=content_hash(content),
+                    content=content,
+                    mime_type="text/plain",
+                    knowledge_base_id=knowledge_base_id,
+                    data_source_id=data_source_id,
+                    source_uri=final_url,
+                    last_modified_at=datetime.now(UTC),
                 )
-                continue
-            soup = BeautifulSoup(page.content(), "html.parser")
-            for t in IGNORE_TAGS:
-                for tag in soup.find_all(t):
-                    tag.extract()
-            for c in IGNORE_CLASSES:
-                for tag in soup.find_all(class_=c):
-                    tag.extract()
-            content = MarkdownConverter().convert_soup(soup)
-            title = page.title()
-            visited.add(final_url)
-            document = Document(
-                name=title,
-                hash=hash(content),
-                content=content,
-                mime_type="text/plain",
-                knowledge_base_id=knowledge_base_id,
-                data_source_id=data_source_id,
-                source_uri=final_url,
-                last_modified_at=datetime.now(UTC),
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await context.close()
+            await browser.close()
+
+
+async def _aload_web_page(
+    context: BrowserContext, url: str
+) -> Optional[Tuple[str, str, str]]:
+    page = await context.new_page()
+    try:
+        response = await page.goto(url)
+        if response is not None and response.status >= 400:
+            logger.error(
+                f"Failed to load page: {url}, response status: {response.status}, skipping"
             )
-            yield document
-        browser.close()
+            return None
+        return page.url, await page.title(), await page.content()
+    finally:
+        await page.close()
+
+
+def html_to_markdown(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    # Match all the ignored tags and classes in a single walk of the tree.
+    for tag in soup.select(_IGNORE_SELECTOR):
+        # The tag may be inside an ignored tag that has been decomposed already.
+        if not tag.decomposed:
+            tag.decompose()
+    return _markdown_converter.convert_soup(soup)
@@ -142,7 +142,12 @@ class TiDBVectorStore(BasePydanticVectorStore):
                 }
             )
 
-        self._session.bulk_insert_mappings(self._chunk_db_model, items)
+        if not items:
+            return []
+
+        # ORM bulk insert, the rows are sent in batched multi-row INSERTs without
+        # building the model instances.
+        self._session.execute(sqlalchemy.insert(self._chunk_db_model), items)
         self._session.commit()
         return [i["id"] for i in items]
 
@@ -1,10 +1,18 @@
+import copy
 import logging
+import threading
+import time
 import dspy
-from typing import List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+DECOMPOSE_CACHE_MAX_SIZE = 4096
+DECOMPOSE_CACHE_TTL_SECS = 3600
+
 
 class SubQuestion(BaseModel):
     """Representation of a single step-by-step question extracted from the user query."""
@@ -67,11 +75,56 @@ class DecomposeQueryModule(dspy.Module):
             return self.prog(query=query)
 
 
+# The decomposed sub questions shared by the decomposers of the process, keyed by
+# (model, compiled program path, normalized query).
+_decompose_cache: OrderedDict[tuple, Tuple[float, SubQuestions]] = OrderedDict()
+_decompose_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _load_complied_program_state(complied_program_path: str) -> dict:
+    # Load the compiled program from disk once, the decomposers created for every
+    # request only copy its state.
+    prog = DecomposeQueryModule(dspy_lm=None)
+    prog.load(complied_program_path)
+    return prog.dump_state()
+
+
 class QueryDecomposer:
     def __init__(self, dspy_lm: dspy.LM, complied_program_path: Optional[str] = None):
         self.decompose_query_prog = DecomposeQueryModule(dspy_lm=dspy_lm)
         if complied_program_path is not None:
-            self.decompose_query_prog.load(complied_program_path)
+            self.decompose_query_prog.load_state(
+                copy.deepcopy(_load_complied_program_state(complied_program_path))
+            )
+        # The LLMs with the same model name may be served by different endpoints.
+        lm_kwargs = dspy_lm.kwargs or {}
+        self._cache_key_prefix = (
+            type(getattr(dspy_lm, "provider", None)).__name__,
+            dspy_lm.model,
+            lm_kwargs.get("api_base"),
+            lm_kwargs.get("api_version"),
+            complied_program_path or "",
+        )
 
     def decompose(self, query: str) -> SubQuestions:
-        return self.decompose_query_prog(query=query).subquestions
+        key = (*self._cache_key_prefix, query.strip().casefold())
+        now = time.monotonic()
+        with _decompose_cache_lock:
+            cached = _decompose_cache.get(key)
+            if cached is not None and cached[0] > now:
+                _decompose_cache.move_to_end(key)
+                # Copy the cached result, so that the callers can't modify it.
+                return cached[1].model_copy(deep=True)
+
+        subquestions = self.decompose_query_prog(query=query).subquestions
+
+        with _decompose_cache_lock:
+            _decompose_cache[key] = (
+                now + DECOMPOSE_CACHE_TTL_SECS,
+                subquestions.model_copy(deep=True),
+            )
+            _decompose_cache.move_to_end(key)
+            while len(_decompose_cache) > DECOMPOSE_CACHE_MAX_SIZE:
+                _decompose_cache.popitem(last=False)
+        return subquestions
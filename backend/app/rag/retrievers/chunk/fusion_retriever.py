@@ -1,21 +1,25 @@
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, Hashable, List, Optional, Dict, Tuple
 from llama_index.core import QueryBundle
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.llms import LLM
-from llama_index.core.schema import NodeWithScore
+from llama_index.core.schema import BaseNode, NodeWithScore
 from sqlmodel import Session
+from app.models import KnowledgeBase
 from app.rag.retrievers.chunk.simple_retriever import (
     ChunkSimpleRetriever,
 )
 from app.rag.retrievers.chunk.schema import (
-    RetrievedChunkDocument,
     VectorSearchRetrieverConfig,
     ChunksRetrievalResult,
     ChunkRetriever,
 )
-from app.rag.retrievers.chunk.helpers import map_nodes_to_chunks
+from app.rag.retrievers.chunk.helpers import (
+    fetch_documents_by_ids,
+    map_nodes_to_chunks,
+)
 from app.rag.retrievers.multiple_knowledge_base import MultiKBFusionRetriever
-from app.repositories import knowledge_base_repo, document_repo
+from app.repositories import knowledge_base_repo
 
 
 class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
@@ -27,11 +31,18 @@ class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
         use_query_decompose: bool = False,
         config: VectorSearchRetrieverConfig = VectorSearchRetrieverConfig(),
         callback_manager: Optional[CallbackManager] = CallbackManager([]),
+        knowledge_bases: Optional[List[KnowledgeBase]] = None,
+        read_session_factory: Optional[Callable[[], Session]] = None,
         **kwargs,
     ):
+        self._read_session_factory = read_session_factory
+
         # Prepare vector search retrievers for knowledge bases.
         retrievers = []
-        knowledge_bases = knowledge_base_repo.get_by_ids(db_session, knowledge_base_ids)
+        if knowledge_bases is None:
+            knowledge_bases = knowledge_base_repo.get_by_ids(
+                db_session, knowledge_base_ids
+            )
         for kb in knowledge_bases:
             retrievers.append(
                 ChunkSimpleRetriever(
@@ -39,6 +50,7 @@ class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
                     config=config,
                     callback_manager=callback_manager,
                     db_session=db_session,
+                    read_session_factory=read_session_factory,
                 )
             )
 
@@ -48,9 +60,19 @@ class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
             llm=llm,
             use_query_decompose=use_query_decompose,
             callback_manager=callback_manager,
+            semantic_cache_namespace=(
+                tuple(kb.id for kb in knowledge_bases),
+                config.model_dump_json(),
+            ),
             **kwargs,
         )
 
+    def _get_retriever_embed_model(
+        self, retriever_idx: int
+    ) -> Optional[Tuple[Hashable, BaseEmbedding]]:
+        retriever: ChunkSimpleRetriever = self._retrievers[retriever_idx]
+        return retriever._kb.embedding_model_id, retriever._embed_model
+
     def _fusion(
         self, query: str, results: Dict[Tuple[str, int], List[NodeWithScore]]
     ) -> List[NodeWithScore]:
@@ -60,20 +82,22 @@ class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
         self, query: str, results: Dict[Tuple[str, int], List[NodeWithScore]]
     ):
         """Apply simple fusion."""
-        # Use a dict to de-duplicate nodes
-        all_nodes: Dict[str, NodeWithScore] = {}
+        # Use a dict to de-duplicate nodes, keep the best score of each node.
+        best: Dict[str, Tuple[float, BaseNode]] = {}
         for nodes_with_scores in results.values():
             for node_with_score in nodes_with_scores:
                 hash = node_with_score.node.hash
-                if hash in all_nodes:
-                    max_score = max(
-                        node_with_score.score or 0.0, all_nodes[hash].score or 0.0
-                    )
-                    all_nodes[hash].score = max_score
-                else:
-                    all_nodes[hash] = node_with_score
+                score = node_with_score.score or 0.0
+                current = best.get(hash)
+                if current is None or score > current[0]:
+                    best[hash] = (score, node_with_score.node)
 
-        return sorted(all_nodes.values(), key=lambda x: x.score or 0.0, reverse=True)
+        return [
+            NodeWithScore.model_construct(node=node, score=score)
+            for score, node in sorted(
+                best.values(), key=lambda item: item[0], reverse=True
+            )
+        ]
 
     def retrieve_chunks(
         self,
@@ -81,19 +105,12 @@ class ChunkFusionRetriever(MultiKBFusionRetriever, ChunkRetriever):
         full_document: bool = False,
     ) -> ChunksRetrievalResult:
         nodes_with_score = self._retrieve(QueryBundle(query_str))
-        chunks = map_nodes_to_chunks(nodes_with_score)
+        chunks, document_ids = map_nodes_to_chunks(nodes_with_score)
 
-        document_ids = [c.document_id for c in chunks]
-        documents = document_repo.fetch_by_ids(self._db_session, document_ids)
-        if full_document:
-            return ChunksRetrievalResult(chunks=chunks, documents=documents)
-        else:
-            return ChunksRetrievalResult(
-                chunks=chunks,
-                documents=[
-                    RetrievedChunkDocument(
-                        id=d.id, name=d.name, source_uri=d.source_uri
-                    )
-                    for d in documents
-                ],
-            )
+        documents = fetch_documents_by_ids(
+            self._db_session,
+            document_ids,
+            self._read_session_factory,
+            full_document=full_document,
+        )
+        return ChunksRetrievalResult(chunks=chunks, documents=documents)
@@ -1,18 +1,65 @@
-from typing import List
+from typing import Callable, List, Optional, Tuple, Union
 
 from llama_index.core.schema import NodeWithScore
+from sqlmodel import Session
 
-from app.rag.retrievers.chunk.schema import RetrievedChunk
+from app.models import Document
+from app.rag.retrievers.chunk.schema import RetrievedChunk, RetrievedChunkDocument
+from app.repositories import document_repo
 
 
-def map_nodes_to_chunks(nodes_with_score: List[NodeWithScore]) -> List[RetrievedChunk]:
+def map_nodes_to_chunks(
+    nodes_with_score: List[NodeWithScore],
+) -> Tuple[List[RetrievedChunk], List[int]]:
+    """
+    Map the retrieved nodes to chunks, and collect the de-duplicated ids of
+    the documents they belong to in the same pass.
+    """
+    chunks = []
+    document_ids = set()
+    for ns in nodes_with_score:
+        document_id = ns.node.metadata["document_id"]
+        if document_id is not None:
+            document_ids.add(document_id)
+        chunks.append(
+            RetrievedChunk(
+                id=ns.node.node_id,
+                text=ns.node.text,
+                metadata=ns.node.metadata,
+                document_id=document_id,
+                score=ns.score,
+            )
+        )
+    return chunks, sorted(document_ids)
+
+
+def fetch_documents_by_ids(
+    db_session: Session,
+    document_ids: List[int],
+    read_session_factory: Optional[Callable[[], Session]] = None,
+    full_document: bool = True,
+) -> Union[List[Document], List[RetrievedChunkDocument]]:
+    """
+    Fetch the documents of the retrieved chunks, using a read replica session
+    if the factory is provided, otherwise fall back to the given session.
+
+    If full_document is False, only the columns of RetrievedChunkDocument are
+    selected from the database.
+    """
+    if read_session_factory is None:
+        return _fetch_documents_by_ids(db_session, document_ids, full_document)
+    with read_session_factory() as read_session:
+        return _fetch_documents_by_ids(read_session, document_ids, full_document)
+
+
+def _fetch_documents_by_ids(
+    session: Session, document_ids: List[int], full_document: bool
+) -> Union[List[Document], List[RetrievedChunkDocument]]:
+    if full_document:
+        return document_repo.fetch_by_ids(session, document_ids)
     return [
-        RetrievedChunk(
-            id=ns.node.node_id,
-            text=ns.node.text,
-            metadata=ns.node.metadata,
-            document_id=ns.node.metadata["document_id"],
-            score=ns.score,
+        RetrievedChunkDocument(id=id, name=name, source_uri=source_uri)
+        for id, name, source_uri in document_repo.fetch_simple_by_ids(
+            session, document_ids
         )
-        for ns in nodes_with_score
     ]
@@ -1,11 +1,13 @@
 import logging
 
-from typing import List, Optional, Type
+from itertools import repeat
+from typing import Callable, List, Optional, Type
 
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.indices.utils import log_vector_store_query_result
 from llama_index.core.vector_stores import VectorStoreQuery, VectorStoreQueryResult
 from sqlmodel import Session
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
 from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import NodeWithScore, QueryBundle
 import llama_index.core.instrumentation as instrument
@@ -15,15 +17,17 @@ from app.models.chunk import get_kb_chunk_model
 from app.rag.knowledge_base.config import get_kb_embed_model
 from app.rag.rerankers.resolver import resolve_reranker_by_id
 from app.rag.retrievers.chunk.schema import (
-    RetrievedChunkDocument,
     VectorSearchRetrieverConfig,
     ChunksRetrievalResult,
     ChunkRetriever,
 )
-from app.rag.retrievers.chunk.helpers import map_nodes_to_chunks
+from app.rag.retrievers.chunk.helpers import (
+    fetch_documents_by_ids,
+    map_nodes_to_chunks,
+)
 from app.rag.indices.vector_search.vector_store.tidb_vector_store import TiDBVectorStore
 from app.rag.postprocessors.metadata_post_filter import MetadataPostFilter
-from app.repositories import knowledge_base_repo, document_repo
+from app.repositories import knowledge_base_repo
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +44,7 @@ class ChunkSimpleRetriever(BaseRetriever, ChunkRetriever):
         config: VectorSearchRetrieverConfig,
         db_session: Optional[Session] = None,
         callback_manager: CallbackManager = CallbackManager([]),
+        read_session_factory: Optional[Callable[[], Session]] = None,
     ):
         super().__init__()
         if not knowledge_base_id:
@@ -47,6 +52,7 @@ class ChunkSimpleRetriever(BaseRetriever, ChunkRetriever):
 
         self._config = config
         self._db_session = db_session
+        self._read_session_factory = read_session_factory
         self._kb = knowledge_base_repo.must_get(db_session, knowledge_base_id)
         self._chunk_db_model = get_kb_chunk_model(self._kb)
         self._embed_model = get_kb_embed_model(db_session, self._kb)
@@ -61,23 +67,19 @@ class ChunkSimpleRetriever(BaseRetriever, ChunkRetriever):
         )
 
         # Init node postprocessors.
-        node_postprocessors = []
-
         # Metadata filter
+        self._metadata_filter: Optional[MetadataPostFilter] = None
         filter_config = config.metadata_filter
         if filter_config and filter_config.enabled:
-            metadata_filter = MetadataPostFilter(filter_config.filters)
-            node_postprocessors.append(metadata_filter)
+            self._metadata_filter = MetadataPostFilter(filter_config.filters)
 
         # Reranker
+        self._reranker: Optional[BaseNodePostprocessor] = None
         reranker_config = config.reranker
         if reranker_config and reranker_config.enabled:
-            reranker = resolve_reranker_by_id(
+            self._reranker = resolve_reranker_by_id(
                 db_session, reranker_config.model_id, reranker_config.top_n
             )
-            node_postprocessors.append(reranker)
-
-        self._node_postprocessors = node_postprocessors
 
     @dispatcher.span
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
@@ -94,44 +96,43 @@ class ChunkSimpleRetriever(BaseRetriever, ChunkRetriever):
             )
         )
         nodes = self._build_node_list_from_query_result(result)
+        nodes = self._apply_postprocessors(nodes, query_bundle)
+        return nodes[: self._config.top_k]
 
-        for node_postprocessor in self._node_postprocessors:
-            nodes = node_postprocessor.postprocess_nodes(
-                nodes, query_bundle=query_bundle
-            )
+    def _apply_postprocessors(
+        self, nodes: List[NodeWithScore], query_bundle: QueryBundle
+    ) -> List[NodeWithScore]:
+        # Apply the metadata filter inline, so that only the matched nodes
+        # are fed to the reranker.
+        if self._metadata_filter is not None:
+            nodes = [
+                n for n in nodes if self._metadata_filter.match_all_filters(n.node)
+            ]
 
-        return nodes[: self._config.top_k]
+        if self._reranker is not None and len(nodes) > 0:
+            nodes = self._reranker.postprocess_nodes(nodes, query_bundle=query_bundle)
+
+        return nodes
 
     def _build_node_list_from_query_result(
         self, query_result: VectorStoreQueryResult
     ) -> List[NodeWithScore]:
         log_vector_store_query_result(query_result)
-        node_with_scores: List[NodeWithScore] = []
-        for ind, node in enumerate(query_result.nodes):
-            score: Optional[float] = None
-            if query_result.similarities is not None:
-                score = query_result.similarities[ind]
-            node_with_scores.append(NodeWithScore(node=node, score=score))
-
-        return node_with_scores
+        similarities = query_result.similarities or repeat(None)
+        return [
+            NodeWithScore(node=node, score=score)
+            for node, score in zip(query_result.nodes, similarities)
+        ]
 
     def retrieve_chunks(
         self, query_str: str, full_document: bool = False
     ) -> ChunksRetrievalResult:
         nodes_with_score = self.retrieve(query_str)
-        chunks = map_nodes_to_chunks(nodes_with_score)
-        document_ids = [c.document_id for c in chunks]
-        documents = document_repo.fetch_by_ids(self._db_session, document_ids)
-
-        if full_document:
-            return ChunksRetrievalResult(chunks=chunks, documents=documents)
-        else:
-            return ChunksRetrievalResult(
-                chunks=chunks,
-                documents=[
-                    RetrievedChunkDocument(
-                        id=d.id, name=d.name, source_uri=d.source_uri
-                    )
-                    for d in documents
-                ],
-            )
+        chunks, document_ids = map_nodes_to_chunks(nodes_with_score)
+        documents = fetch_documents_by_ids(
+            self._db_session,
+            document_ids,
+            self._read_session_factory,
+            full_document=full_document,
+        )
+        return ChunksRetrievalResult(chunks=chunks, documents=documents)
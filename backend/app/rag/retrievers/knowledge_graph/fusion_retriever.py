@@ -1,12 +1,16 @@
+import asyncio
 import logging
 
 from sqlmodel import Session
-from typing import List, Optional, Dict, Tuple
+from typing import Hashable, List, Optional, Dict, Tuple
 from llama_index.core import QueryBundle
+from llama_index.core.async_utils import asyncio_run
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.schema import NodeWithScore
 from llama_index.core.llms import LLM
 
+from app.api.admin_routes.models import KnowledgeBaseDescriptor
 from app.models import KnowledgeBase
 from app.rag.retrievers.multiple_knowledge_base import MultiKBFusionRetriever
 from app.rag.retrievers.knowledge_graph.simple_retriever import (
@@ -17,15 +21,22 @@ from app.rag.retrievers.knowledge_graph.schema import (
     KnowledgeGraphRetrievalResult,
     KnowledgeGraphNode,
     KnowledgeGraphRetriever,
+    RetrievedEntity,
+    RetrievedRelationship,
 )
+from app.rag.types import MyCBEventType
 from app.repositories import knowledge_base_repo
 
 
 logger = logging.getLogger(__name__)
 
+# The constant of the reciprocal rank fusion, which dampens the impact of top ranks.
+RRF_K = 60
+
 
 class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetriever):
-    knowledge_base_map: Dict[int, KnowledgeBase] = {}
+    knowledge_base_map: Dict[int, KnowledgeBase]
+    knowledge_base_descriptors: Dict[int, KnowledgeBaseDescriptor]
 
     def __init__(
         self,
@@ -35,20 +46,31 @@ class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetrie
         use_query_decompose: bool = False,
         config: KnowledgeGraphRetrieverConfig = KnowledgeGraphRetrieverConfig(),
         callback_manager: Optional[CallbackManager] = CallbackManager([]),
+        knowledge_bases: Optional[List[KnowledgeBase]] = None,
+        max_concurrency: int = 4,
         **kwargs,
     ):
         self.use_query_decompose = use_query_decompose
+        self._include_subgraphs = config.include_subgraphs
 
         # Prepare knowledge graph retrievers for knowledge bases.
         retrievers = []
-        knowledge_bases = knowledge_base_repo.get_by_ids(db_session, knowledge_base_ids)
+        if knowledge_bases is None:
+            knowledge_bases = knowledge_base_repo.get_by_ids(
+                db_session, knowledge_base_ids
+            )
         self.knowledge_bases = knowledge_bases
+        self.knowledge_base_map = {}
+        # Build the knowledge base descriptors once, instead of on every retrieval.
+        self.knowledge_base_descriptors = {}
         for kb in knowledge_bases:
             self.knowledge_base_map[kb.id] = kb
+            self.knowledge_base_descriptors[kb.id] = kb.to_descriptor()
             retrievers.append(
                 KnowledgeGraphSimpleRetriever(
                     db_session=db_session,
                     knowledge_base_id=kb.id,
+                    knowledge_base=kb,
                     config=config,
                     callback_manager=callback_manager,
                 )
@@ -60,9 +82,84 @@ class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetrie
             llm=llm,
             use_query_decompose=use_query_decompose,
             callback_manager=callback_manager,
+            semantic_cache_namespace=(
+                tuple(kb.id for kb in knowledge_bases),
+                config.model_dump_json(),
+            ),
+            max_concurrency=max_concurrency,
             **kwargs,
         )
 
+    def _retrieve_from_knowledge_bases(
+        self, query_bundle: QueryBundle
+    ) -> List[NodeWithScore]:
+        return asyncio_run(self._aretrieve(query_bundle))
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        if self._use_query_decompose:
+            queries = self._gen_sub_queries(query_bundle)
+        else:
+            queries = [query_bundle]
+
+        with self.callback_manager.event(
+            MyCBEventType.RUN_SUB_QUERIES, payload={"queries": queries}
+        ):
+            # The knowledge graph retrieval is dominated by the database round-trips
+            # and embedding calls, so fan out the (sub query, knowledge base) pairs
+            # to worker threads, the semaphore caps the number of DB connections.
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+            # Resolve the lazy graph stores before fanning out, since resolving
+            # them uses the request session, which must stay on this thread.
+            for retriever in self._retrievers:
+                retriever.resolve_stores()
+            task_queries, task_indexes = self._build_task_queries(queries)
+            embeddings = await self._aembed_task_queries(task_queries, queries)
+            task_results = await asyncio.gather(
+                *[
+                    self._aretrieve_in_thread(
+                        semaphore,
+                        query_str,
+                        i,
+                        embeddings[(query_str, i)],
+                    )
+                    for query_str, i in task_queries
+                ],
+                return_exceptions=True,
+            )
+            results = self._collect_task_results(
+                task_queries, task_indexes, task_results
+            )
+
+        return self._fusion(query_bundle.query_str, results)
+
+    def _get_retriever_embed_model(
+        self, retriever_idx: int
+    ) -> Optional[Tuple[Hashable, BaseEmbedding]]:
+        retriever: KnowledgeGraphSimpleRetriever = self._retrievers[retriever_idx]
+        return retriever.knowledge_base.embedding_model_id, retriever.embed_model
+
+    async def _aretrieve_in_thread(
+        self,
+        semaphore: asyncio.Semaphore,
+        query_str: str,
+        retriever_idx: int,
+        embedding: Embedding,
+    ) -> List[NodeWithScore]:
+        async with semaphore:
+            return await asyncio.to_thread(
+                self._retrieve_with_new_session, query_str, retriever_idx, embedding
+            )
+
+    def _retrieve_with_new_session(
+        self, query_str: str, retriever_idx: int, embedding: Embedding
+    ) -> List[NodeWithScore]:
+        # The SQLAlchemy session is not thread-safe, each worker thread uses its own.
+        retriever: KnowledgeGraphSimpleRetriever = self._retrievers[retriever_idx]
+        with Session(self._db_session.get_bind(), expire_on_commit=False) as session:
+            return retriever.retrieve_with_session(
+                QueryBundle(query_str), session, embedding=embedding
+            )
+
     def retrieve_knowledge_graph(
         self, query_text: str
     ) -> KnowledgeGraphRetrievalResult:
@@ -71,17 +168,19 @@ class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetrie
             return KnowledgeGraphRetrievalResult()
         node: KnowledgeGraphNode = nodes_with_score[0].node  # type:ignore
 
-        return KnowledgeGraphRetrievalResult(
+        # The retrieved entities and relationships have been validated already,
+        # skip validating them again when assembling the result.
+        return KnowledgeGraphRetrievalResult.model_construct(
             query=node.query,
-            knowledge_bases=[kb.to_descriptor() for kb in self.knowledge_bases],
+            knowledge_bases=list(self.knowledge_base_descriptors.values()),
             entities=node.entities,
             relationships=node.relationships,
             subgraphs=[
-                KnowledgeGraphRetrievalResult(
+                KnowledgeGraphRetrievalResult.model_construct(
                     query=child_node.query,
-                    knowledge_base=self.knowledge_base_map[
+                    knowledge_base=self.knowledge_base_descriptors[
                         child_node.knowledge_base_id
-                    ].to_descriptor(),
+                    ],
                     entities=child_node.entities,
                     relationships=child_node.relationships,
                 )
@@ -97,8 +196,9 @@ class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetrie
     def _knowledge_graph_fusion(
         self, query: str, results: Dict[Tuple[str, int], List[NodeWithScore]]
     ) -> List[NodeWithScore]:
-        merged_entities = set()
-        merged_relationships = {}
+        merged_entities: Dict[str, RetrievedEntity] = {}
+        merged_relationships: Dict[str, RetrievedRelationship] = {}
+        rrf_scores: Dict[str, float] = {}
         merged_knowledge_base_ids = set()
         merged_children_nodes = []
 
@@ -111,25 +211,38 @@ class KnowledgeGraphFusionRetriever(MultiKBFusionRetriever, KnowledgeGraphRetrie
             merged_knowledge_base_ids.add(node.knowledge_base_id)
 
             # Merge entities.
-            merged_entities.update(node.entities)
-
-            # Merge relationships.
-            for r in node.relationships:
-                key = r.rag_description
-                if key not in merged_relationships:
-                    merged_relationships[key] = r
-                else:
-                    merged_relationships[key].weight += r.weight
+            for e in node.entities:
+                merged_entities.setdefault(e.global_id, e)
+
+            # Merge relationships with reciprocal rank fusion, the relationships of
+            # each retrieval are ranked by their weight.
+            ranked_relationships = sorted(
+                node.relationships, key=lambda r: r.weight or 0.0, reverse=True
+            )
+            for rank, r in enumerate(ranked_relationships):
+                key = r.global_id
+                merged_relationships.setdefault(key, r)
+                rrf_scores[key] = rrf_scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
             # Merge to children nodes.
-            merged_children_nodes.append(node)
+            if self._include_subgraphs:
+                merged_children_nodes.append(node)
+
+        # Use the fused score as the weight of the merged relationships, the copies
+        # keep the relationships of the children nodes unchanged.
+        fused_relationships = [
+            merged_relationships[key].model_copy(update={"weight": score})
+            for key, score in sorted(
+                rrf_scores.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
 
         return [
             NodeWithScore(
-                node=KnowledgeGraphNode(
+                node=KnowledgeGraphNode.model_construct(
                     query=query,
-                    entities=list(merged_entities),
-                    relationships=list(merged_relationships.values()),
-                    knowledge_base_ids=merged_knowledge_base_ids,
+                    entities=list(merged_entities.values()),
+                    relationships=fused_relationships,
+                    knowledge_base_ids=list(merged_knowledge_base_ids),
                     children=merged_children_nodes,
                 ),
                 score=1,
@@ -3,10 +3,10 @@ import json
 from abc import ABC
 from enum import Enum
 
-from hashlib import sha256
+from hashlib import blake2b
 from typing import Optional, Mapping, Any, List
 from llama_index.core.schema import BaseNode, MetadataMode
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from app.models.entity import EntityType
 from app.api.admin_routes.models import KnowledgeBaseDescriptor
@@ -23,6 +23,8 @@ class KnowledgeGraphRetrieverConfig(BaseModel):
     depth: int = 2
     include_meta: bool = False
     with_degree: bool = False
+    # Whether to keep the per knowledge base / sub query graphs in the fused result.
+    include_subgraphs: bool = True
     metadata_filter: Optional[MetadataFilterConfig] = None
 
 
@@ -139,20 +141,23 @@ class RetrievedKnowledgeGraph(RetrievedSubGraph):
         For forward compatibility, we need to convert the subgraphs to a dictionary
         of subqueries and then pass it to the prompt template.
         """
+        # The same entity / relationship objects can appear in multiple subgraphs,
+        # make sure each of them is only dumped once.
+        dumped = {}
+
+        def dump(model: BaseModel) -> dict:
+            key = id(model)
+            if key not in dumped:
+                dumped[key] = model.model_dump()
+            return dumped[key]
+
         subqueries = {}
         for subgraph in self.subgraphs:
-            if subgraph.query not in subqueries:
-                subqueries[subgraph.query] = {
-                    "entities": [e.model_dump() for e in subgraph.entities],
-                    "relationships": [r.model_dump() for r in subgraph.relationships],
-                }
-            else:
-                subqueries[subgraph.query]["entities"].extend(
-                    [e.model_dump() for e in subgraph.entities]
-                )
-                subqueries[subgraph.query]["relationships"].extend(
-                    [r.model_dump() for r in subgraph.relationships]
-                )
+            subquery = subqueries.setdefault(
+                subgraph.query, {"entities": [], "relationships": []}
+            )
+            subquery["entities"] += [dump(e) for e in subgraph.entities]
+            subquery["relationships"] += [dump(r) for r in subgraph.relationships]
 
         return subqueries
 
@@ -197,21 +202,37 @@ Relationships:
 {relationships_str}
 """
 DEFAULT_ENTITY_TMPL = """
-- Name: {{ name }}
-  Description: {{ description }}
+- Name: {name}
+  Description: {description}
 """
 DEFAULT_RELATIONSHIP_TMPL = """
-- Description: {{ rag_description }}
-  Weight: {{ weight }}
-  Last Modified At: {{ last_modified_at }}
-  Meta: {{ meta }}
+- Description: {rag_description}
+  Weight: {weight}
+  Last Modified At: {last_modified_at}
+  Meta: {meta}
 """
 
 
+# The fields that the rendered knowledge graph string depends on.
+KNOWLEDGE_GRAPH_CONTENT_FIELDS = {
+    "query",
+    "entities",
+    "relationships",
+    "knowledge_base_template",
+    "entity_template",
+    "relationship_template",
+}
+
+
 class KnowledgeGraphNode(BaseNode):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in KNOWLEDGE_GRAPH_CONTENT_FIELDS:
+            self._invalidate_cache()
+
     query: Optional[str] = Field(description="Query of the knowledge graph")
 
     knowledge_base_id: Optional[int] = Field(
@@ -250,54 +271,56 @@ class KnowledgeGraphNode(BaseNode):
         description="The template to render the relationship list as string",
     )
 
+    # Cache
+
+    _cached_entities_str: Optional[str] = PrivateAttr(default=None)
+    _cached_relationships_str: Optional[str] = PrivateAttr(default=None)
+    _cached_kg_str: Optional[str] = PrivateAttr(default=None)
+    _cached_hash: Optional[str] = PrivateAttr(default=None)
+
+    def _invalidate_cache(self):
+        self._cached_entities_str = None
+        self._cached_relationships_str = None
+        self._cached_kg_str = None
+        self._cached_hash = None
+
     @classmethod
     def get_type(cls) -> str:
         return "KnowledgeGraphNode"
 
     def get_content(self, metadata_mode: MetadataMode = MetadataMode.ALL) -> str:
-        return f"""
-        Query:
-        ------
-        {self.query}
-
-        Entities:
-        ------
-        {self._get_entities_str()}
-        
-        Relationships:
-        ------
-        {self._get_relationships_str()}
-        """
+        return self._get_knowledge_graph_str()
 
     def _get_entities_str(self) -> str:
-        strs = []
-        for entity in self.entities:
-            strs.append(
-                self.entity_template.format(
-                    name=entity.name, description=entity.description
-                )
+        if self._cached_entities_str is None:
+            render = self.entity_template.format
+            self._cached_entities_str = "\n\n".join(
+                render(name=e.name, description=e.description) for e in self.entities
             )
-        return "\n\n".join(strs)
+        return self._cached_entities_str
 
     def _get_relationships_str(self) -> str:
-        strs = []
-        for relationship in self.relationships:
-            strs.append(
-                self.entity_template.format(
-                    rag_description=relationship.rag_description,
-                    weight=relationship.weight,
-                    last_modified_at=relationship.last_modified_at,
-                    meta=json.dumps(relationship.meta, indent=2, ensure_ascii=False),
+        if self._cached_relationships_str is None:
+            render = self.relationship_template.format
+            self._cached_relationships_str = "\n\n".join(
+                render(
+                    rag_description=r.rag_description,
+                    weight=r.weight,
+                    last_modified_at=r.last_modified_at,
+                    meta=json.dumps(r.meta, indent=2, ensure_ascii=False),
                 )
+                for r in self.relationships
             )
-        return "\n\n".join(strs)
+        return self._cached_relationships_str
 
     def _get_knowledge_graph_str(self) -> str:
-        return self.knowledge_base_template.format(
-            query=self.query,
-            entities_str=self._get_entities_str(),
-            relationships_str=self._get_relationships_str(),
-        )
+        if self._cached_kg_str is None:
+            self._cached_kg_str = self.knowledge_base_template.format(
+                query=self.query,
+                entities_str=self._get_entities_str(),
+                relationships_str=self._get_relationships_str(),
+            )
+        return self._cached_kg_str
 
     def set_content(self, kg: RetrievedKnowledgeGraph):
         self.query = kg.query
@@ -306,7 +329,7 @@ class KnowledgeGraphNode(BaseNode):
         self.entities = kg.entities
         self.relationships = kg.relationships
         self.children = [
-            KnowledgeGraphNode(
+            KnowledgeGraphNode.model_construct(
                 query=subgraph.query,
                 knowledge_base_id=subgraph.knowledge_base.id
                 if subgraph.knowledge_base
@@ -319,5 +342,7 @@ class KnowledgeGraphNode(BaseNode):
 
     @property
     def hash(self) -> str:
-        kg_identity = self._get_knowledge_graph_str().encode("utf-8")
-        return str(sha256(kg_identity).hexdigest())
+        if self._cached_hash is None:
+            kg_identity = self._get_knowledge_graph_str().encode("utf-8")
+            self._cached_hash = blake2b(kg_identity, digest_size=16).hexdigest()
+        return self._cached_hash
@@ -1,11 +1,15 @@
-from typing import Optional, List
+from functools import cached_property
+from typing import Optional, List, Type
 
-from sqlmodel import Session
+import dspy
+from sqlmodel import Session, SQLModel
 from llama_index.core import QueryBundle
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import NodeWithScore
 
+from app.models import KnowledgeBase
 from app.models.chunk import get_kb_chunk_model
 from app.models.entity import get_kb_entity_model
 from app.models.relationship import get_kb_relationship_model
@@ -27,47 +31,99 @@ class KnowledgeGraphSimpleRetriever(BaseRetriever, KnowledgeGraphRetriever):
         knowledge_base_id: int,
         config: KnowledgeGraphRetrieverConfig,
         callback_manager: Optional[CallbackManager] = CallbackManager([]),
+        knowledge_base: Optional[KnowledgeBase] = None,
+        embed_model: Optional[BaseEmbedding] = None,
+        dspy_lm: Optional[dspy.LM] = None,
         **kwargs,
     ):
         super().__init__(callback_manager, **kwargs)
         self.config = config
+        self._db_session = db_session
         self._callback_manager = callback_manager
-        self.knowledge_base = knowledge_base_repo.must_get(
+        # Skip loading the knowledge base if the caller has already loaded it.
+        self.knowledge_base = knowledge_base or knowledge_base_repo.must_get(
             db_session, knowledge_base_id
         )
-        self.embed_model = get_kb_embed_model(db_session, self.knowledge_base)
-        self.embed_model.callback_manager = callback_manager
-        self.chunk_db_model = get_kb_chunk_model(self.knowledge_base)
-        self.entity_db_model = get_kb_entity_model(self.knowledge_base)
-        self.relationship_db_model = get_kb_relationship_model(self.knowledge_base)
+        # The models and the graph store are resolved lazily on first retrieval,
+        # so the retrievers that are never used don't pay for them.
+        self._embed_model = embed_model
+        self._dspy_lm = dspy_lm
+
+    @cached_property
+    def embed_model(self) -> BaseEmbedding:
+        embed_model = self._embed_model or get_kb_embed_model(
+            self._db_session, self.knowledge_base
+        )
+        embed_model.callback_manager = self._callback_manager
+        return embed_model
+
+    @cached_property
+    def chunk_db_model(self) -> Type[SQLModel]:
+        return get_kb_chunk_model(self.knowledge_base)
+
+    @cached_property
+    def entity_db_model(self) -> Type[SQLModel]:
+        return get_kb_entity_model(self.knowledge_base)
+
+    @cached_property
+    def relationship_db_model(self) -> Type[SQLModel]:
+        return get_kb_relationship_model(self.knowledge_base)
+
+    @cached_property
+    def kg_store(self) -> TiDBGraphStore:
         # TODO: remove it
-        dspy_lm = get_kb_dspy_llm(db_session, self.knowledge_base)
-        self._kg_store = TiDBGraphStore(
+        dspy_lm = self._dspy_lm or get_kb_dspy_llm(
+            self._db_session, self.knowledge_base
+        )
+        return TiDBGraphStore(
             knowledge_base=self.knowledge_base,
             dspy_lm=dspy_lm,
-            session=db_session,
+            session=self._db_session,
             embed_model=self.embed_model,
             entity_db_model=self.entity_db_model,
             relationship_db_model=self.relationship_db_model,
             chunk_db_model=self.chunk_db_model,
         )
 
+    def resolve_stores(self) -> TiDBGraphStore:
+        """
+        Resolve the lazy graph store (and the models it depends on) with the
+        retriever's session, which must be done on the thread owning the session.
+        """
+        return self.kg_store
+
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self.retrieve_with_session(query_bundle)
+
+    def retrieve_with_session(
+        self,
+        query_bundle: QueryBundle,
+        session: Optional[Session] = None,
+        embedding: Optional[Embedding] = None,
+    ) -> List[NodeWithScore]:
+        """
+        Retrieve the knowledge graph with the given session, which allows the
+        retrieval to run in a worker thread without sharing the retriever's session.
+
+        If the query embedding is provided, it is used as is instead of embedding
+        the query again.
+        """
         metadata_filters = {}
         if self.config.metadata_filter and self.config.metadata_filter.enabled:
             metadata_filters = self.config.metadata_filter.filters
 
-        entities, relationships = self._kg_store.retrieve_with_weight(
+        entities, relationships = self.kg_store.retrieve_with_weight(
             query_bundle.query_str,
-            embedding=[],
+            embedding=embedding or query_bundle.embedding or [],
             depth=self.config.depth,
             include_meta=self.config.include_meta,
             with_degree=self.config.with_degree,
             relationship_meta_filters=metadata_filters,
+            session=session,
         )
         return [
             NodeWithScore(
-                node=KnowledgeGraphNode(
+                node=KnowledgeGraphNode.model_construct(
                     query=query_bundle.query_str,
                     knowledge_base_id=self.knowledge_base.id,
                     entities=entities,
@@ -84,7 +140,7 @@ class KnowledgeGraphSimpleRetriever(BaseRetriever, KnowledgeGraphRetriever):
         if len(nodes_with_score) == 0:
             return KnowledgeGraphRetrievalResult()
         node: KnowledgeGraphNode = nodes_with_score[0].node  # type:ignore
-        return KnowledgeGraphRetrievalResult(
+        return KnowledgeGraphRetrievalResult.model_construct(
             query=node.query,
             knowledge_base=self.knowledge_base.to_descriptor(),
             entities=node.entities,
@@ -1,12 +1,15 @@
+import asyncio
+import logging
 from abc import abstractmethod
 
 import dspy
 
-from typing import List, Optional, Dict, Tuple
+from typing import Hashable, List, Optional, Dict, Tuple
 
 from llama_index.core import QueryBundle
-from llama_index.core.async_utils import run_async_tasks
+from llama_index.core.async_utils import asyncio_run
 from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
 from llama_index.core.callbacks import CallbackManager
 from llama_index.core.llms import LLM
 from llama_index.core.schema import NodeWithScore
@@ -17,12 +20,21 @@ from app.core.config import settings
 from app.rag.question_gen.query_decomposer import QueryDecomposer
 from app.rag.types import MyCBEventType
 from app.rag.llms.dspy import get_dspy_lm_by_llama_llm
+from app.rag.retrievers.semantic_cache import (
+    SemanticCache,
+    SemanticCacheConfig,
+    semantic_cache,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class FusionRetrievalBaseConfig(BaseModel):
     llm_id: Optional[int] = None
     knowledge_base_ids: List[int]
     use_query_decompose: Optional[bool] = None
+    semantic_cache: Optional[SemanticCacheConfig] = None
+    max_concurrent_retrievals: int = 8
 
 
 class MultiKBFusionRetriever(BaseRetriever):
@@ -34,10 +46,23 @@ class MultiKBFusionRetriever(BaseRetriever):
         dspy_lm: Optional[dspy.LM] = None,
         use_query_decompose: bool = True,
         callback_manager: Optional[CallbackManager] = CallbackManager([]),
+        semantic_cache_config: Optional[SemanticCacheConfig] = None,
+        semantic_cache_namespace: Optional[Hashable] = None,
+        max_concurrency: int = 8,
         **kwargs,
     ):
         super().__init__(callback_manager, **kwargs)
         self._use_query_decompose = use_query_decompose
+        self._max_concurrency = max_concurrency
+        self._semantic_cache_config = semantic_cache_config
+        # The results are only shared between the retrievers with the same namespace,
+        # which should identify the knowledge bases and the retrieval config.
+        self._semantic_cache_namespace = (
+            type(self).__name__,
+            use_query_decompose,
+            semantic_cache_namespace,
+        )
+        self._semantic_cache: SemanticCache = semantic_cache
         self._db_session = db_session
         self._callback_manager = callback_manager
 
@@ -52,6 +77,56 @@ class MultiKBFusionRetriever(BaseRetriever):
         self._retrievers = retrievers
 
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        cache_config = self._semantic_cache_config
+        query_embed_model = self._get_query_embed_model()
+        if (
+            cache_config is None
+            or not cache_config.enabled
+            or query_embed_model is None
+        ):
+            return self._retrieve_from_knowledge_bases(query_bundle)
+
+        if query_bundle.embedding is None:
+            _, embed_model = query_embed_model
+            # Pass the embedding down, the retrievals reuse it for the query.
+            query_bundle = QueryBundle(
+                query_bundle.query_str,
+                embedding=embed_model.get_query_embedding(query_bundle.query_str),
+            )
+
+        cached_nodes = self._semantic_cache.get(
+            self._semantic_cache_namespace,
+            query_bundle.embedding,
+            cache_config.similarity_threshold,
+        )
+        if cached_nodes is not None:
+            # Copy the cached nodes, the callers may rescore or modify them.
+            return [n.model_copy(deep=True) for n in cached_nodes]
+
+        nodes = self._retrieve_from_knowledge_bases(query_bundle)
+        self._semantic_cache.put(
+            self._semantic_cache_namespace,
+            query_bundle.embedding,
+            query_bundle.query_str,
+            [n.model_copy(deep=True) for n in nodes],
+            ttl_secs=cache_config.ttl_secs,
+            max_entries=cache_config.max_entries,
+        )
+        return nodes
+
+    def _get_query_embed_model(self) -> Optional[Tuple[Hashable, BaseEmbedding]]:
+        """
+        Get the key and the embedding model that the query embedding in the query
+        bundle is computed with, which is also used to look up the semantic cache.
+        Return None to disable the semantic cache.
+        """
+        if len(self._retrievers) == 0:
+            return None
+        return self._get_retriever_embed_model(0)
+
+    def _retrieve_from_knowledge_bases(
+        self, query_bundle: QueryBundle
+    ) -> List[NodeWithScore]:
         if self._use_query_decompose:
             queries = self._gen_sub_queries(query_bundle)
         else:
@@ -60,19 +135,150 @@ class MultiKBFusionRetriever(BaseRetriever):
         with self.callback_manager.event(
             MyCBEventType.RUN_SUB_QUERIES, payload={"queries": queries}
         ):
-            tasks, task_queries = [], []
+            results = asyncio_run(self._arun_queries(queries))
+
+        return self._fusion(query_bundle.query_str, results)
+
+    async def _arun_queries(
+        self, queries: List[QueryBundle]
+    ) -> Dict[Tuple[str, int], List[NodeWithScore]]:
+        # Cap the number of in-flight retrievals, so that K sub queries x N knowledge
+        # bases don't stampede the vector stores and the reranker endpoints.
+        semaphore = asyncio.Semaphore(self._max_concurrency)
 
-            for query in queries:
-                for i, retriever in enumerate(self._retrievers):
-                    tasks.append(retriever.aretrieve(query.query_str))
+        async def _bounded_retrieve(
+            retriever: BaseRetriever, query_bundle: QueryBundle
+        ) -> List[NodeWithScore]:
+            async with semaphore:
+                return await retriever.aretrieve(query_bundle)
+
+        task_queries, task_indexes = self._build_task_queries(queries)
+        embeddings = await self._aembed_task_queries(task_queries, queries)
+        task_results = await asyncio.gather(
+            *[
+                _bounded_retrieve(
+                    self._retrievers[i],
+                    QueryBundle(query_str, embedding=embeddings.get((query_str, i))),
+                )
+                for query_str, i in task_queries
+            ],
+            return_exceptions=True,
+        )
+        return self._collect_task_results(task_queries, task_indexes, task_results)
+
+    def _get_retriever_embed_model(
+        self, retriever_idx: int
+    ) -> Optional[Tuple[Hashable, BaseEmbedding]]:
+        """
+        Get the key and the embedding model that the retriever embeds the query with,
+        the retrievers with the same key share the query embedding. Return None if
+        the retriever embeds the query by itself.
+        """
+        return None
+
+    async def _aembed_task_queries(
+        self,
+        task_queries: List[Tuple[str, int]],
+        queries: Optional[List[QueryBundle]] = None,
+    ) -> Dict[Tuple[str, int], Embedding]:
+        """
+        Embed the queries of the tasks concurrently, each query is embedded once per
+        distinct embedding model, instead of once per knowledge base. The embeddings
+        carried by the query bundles are reused for the query embedding model.
+        """
+        key_embeddings: Dict[Tuple[str, Hashable], Embedding] = {}
+        query_embed_model = self._get_query_embed_model()
+        if query_embed_model is not None:
+            query_model_key, _ = query_embed_model
+            for query in queries or []:
+                if query.embedding is not None:
+                    key_embeddings[(query.query_str, query_model_key)] = query.embedding
+
+        embed_models: Dict[Hashable, BaseEmbedding] = {}
+        task_embedding_keys: Dict[Tuple[str, int], Tuple[str, Hashable]] = {}
+        for query_str, i in task_queries:
+            retriever_embed_model = self._get_retriever_embed_model(i)
+            if retriever_embed_model is None:
+                continue
+            model_key, embed_model = retriever_embed_model
+            embed_models.setdefault(model_key, embed_model)
+            task_embedding_keys[(query_str, i)] = (query_str, model_key)
+
+        embedding_keys = [
+            key
+            for key in dict.fromkeys(task_embedding_keys.values())
+            if key not in key_embeddings
+        ]
+        embeddings = await asyncio.gather(
+            *[
+                embed_models[model_key].aget_query_embedding(query_str)
+                for query_str, model_key in embedding_keys
+            ]
+        )
+        key_embeddings.update(zip(embedding_keys, embeddings))
+        return {
+            task: key_embeddings[embedding_key]
+            for task, embedding_key in task_embedding_keys.items()
+        }
+
+    def _build_task_queries(
+        self, queries: List[QueryBundle]
+    ) -> Tuple[List[Tuple[str, int]], Dict[Tuple[str, int], int]]:
+        """
+        Build the (query, retriever index) tasks, the sub queries that only differ
+        in case or surrounding whitespace are retrieved once per retriever.
+
+        Returns the unique tasks and the index of the task for every
+        (query, retriever index) pair.
+        """
+        task_queries = []
+        task_indexes = {}
+        unique_indexes = {}
+        for query in queries:
+            normalized_query = query.query_str.strip().casefold()
+            for i in range(len(self._retrievers)):
+                key = (normalized_query, i)
+                if key not in unique_indexes:
+                    unique_indexes[key] = len(task_queries)
                     task_queries.append((query.query_str, i))
+                task_indexes[(query.query_str, i)] = unique_indexes[key]
+        return task_queries, task_indexes
 
-            task_results = run_async_tasks(tasks)
-            results = {}
-            for query_tuple, query_result in zip(task_queries, task_results):
-                results[query_tuple] = query_result
+    def _collect_task_results(
+        self,
+        task_queries: List[Tuple[str, int]],
+        task_indexes: Dict[Tuple[str, int], int],
+        task_results: list,
+    ) -> Dict[Tuple[str, int], List[NodeWithScore]]:
+        """
+        Collect the results of the retrieval tasks, the failure of one knowledge base
+        is logged and skipped, unless all the retrievals failed.
+        """
+        results = {}
+        errors = []
+        for (query_str, i), result in zip(task_queries, task_results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Failed to retrieve with retriever #%d for query: %s",
+                    i,
+                    query_str,
+                    exc_info=result,
+                )
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                results[(query_str, i)] = result
 
-        return self._fusion(query_bundle.query_str, results)
+        if errors and not results:
+            raise errors[0]
+
+        # Fan out the results of the deduplicated tasks to all the pairs.
+        return {
+            key: results[task_queries[index]]
+            for key, index in task_indexes.items()
+            if task_queries[index] in results
+        }
 
     def _gen_sub_queries(self, query_bundle: QueryBundle) -> List[QueryBundle]:
         queries = self._query_decomposer.decompose(query_bundle.query_str)
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.base.embeddings.base import Embedding
+from pydantic import BaseModel
+
+
+class SemanticCacheConfig(BaseModel):
+    enabled: bool = False
+    similarity_threshold: float = 0.85
+    ttl_secs: int = 300
+    max_entries: int = 1024
+
+
+class SemanticCache:
+    """
+    An in-process cache keyed by query embeddings, a lookup hits when the cosine
+    similarity between the query and a cached query exceeds the threshold.
+
+    The entries are grouped by namespace, so that results retrieved with a
+    different configuration (e.g. other knowledge bases) are never returned.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # namespace -> entry id -> (normalized embedding, query, value, expires at)
+        self._entries: OrderedDict[
+            Hashable, OrderedDict[int, Tuple[np.ndarray, str, Any, float]]
+        ] = OrderedDict()
+        self._next_id = 0
+
+    @staticmethod
+    def _normalize(embedding: Embedding) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def get(
+        self, namespace: Hashable, embedding: Embedding, similarity_threshold: float
+    ) -> Optional[Any]:
+        vector = self._normalize(embedding)
+        if vector is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if not entries:
+                return None
+
+            for entry_id in [k for k, e in entries.items() if e[3] <= now]:
+                del entries[entry_id]
+            if not entries:
+                del self._entries[namespace]
+                return None
+
+            entry_ids: List[int] = list(entries.keys())
+            matrix = np.stack([entries[i][0] for i in entry_ids])
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < similarity_threshold:
+                return None
+
+            entry_id = entry_ids[best]
+            entries.move_to_end(entry_id)
+            self._entries.move_to_end(namespace)
+            return entries[entry_id][2]
+
+    def put(
+        self,
+        namespace: Hashable,
+        embedding: Embedding,
+        query: str,
+        value: Any,
+        ttl_secs: int,
+        max_entries: int,
+    ):
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            self._entries.move_to_end(namespace)
+            entries[self._next_id] = (vector, query, value, time.monotonic() + ttl_secs)
+            self._next_id += 1
+
+            # Evict the least recently used entries across all namespaces.
+            size = sum(len(e) for e in self._entries.values())
+            while size > max_entries:
+                oldest_namespace, oldest_entries = next(iter(self._entries.items()))
+                oldest_entries.popitem(last=False)
+                if not oldest_entries:
+                    del self._entries[oldest_namespace]
+                size -= 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+semantic_cache = SemanticCache()
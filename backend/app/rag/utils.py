@@ -1,6 +1,35 @@
 import re
+from datetime import date
+from functools import lru_cache
 from typing import Tuple, Dict
 
+from llama_index.core.prompts.rich import RichPromptTemplate
+
+
+@lru_cache(maxsize=1)
+def _format_date(day: date) -> str:
+    return day.strftime("%Y-%m-%d")
+
+
+def get_current_date_str() -> str:
+    """
+    Returns the current date in `YYYY-MM-DD` format, which is used as the
+    `current_date` prompt variable, the formatting only happens once per day.
+    """
+    return _format_date(date.today())
+
+
+@lru_cache(maxsize=128)
+def get_prompt_template(template_str: str) -> RichPromptTemplate:
+    """
+    Returns the prompt template of the template string, the templates are cached
+    since parsing them is not free and the prompts of chat engines rarely change.
+
+    The returned template is shared, use `partial_format` to get a copy with
+    the partial variables instead of modifying it.
+    """
+    return RichPromptTemplate(template_str)
+
 
 def _parse_response_format(response_format_str: str) -> Dict[str, str]:
     """
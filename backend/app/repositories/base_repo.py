@@ -1,4 +1,92 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Collection,
+    FrozenSet,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import ARRAY, JSON, inspect, tuple_
+from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.models.base import AESEncryptedColumn
+
+T = TypeVar("T")
+
+# The max number of ids in an IN-list, a longer list is split into batches.
+IN_LIST_BATCH_SIZE = 500
+
+# The max number of rows deleted by a statement of the bulk deletions, each batch
+# is committed separately to keep the locks and the transaction size small.
+DELETE_BATCH_SIZE = 1000
+
+
+def chunked(
+    items: Sequence[T], size: int = IN_LIST_BATCH_SIZE
+) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+@lru_cache(maxsize=None)
+def get_mutable_fields(model_cls: Type[SQLModel]) -> FrozenSet[str]:
+    """
+    Get the fields whose values can be mutated in place (JSON, ARRAY or encrypted
+    JSON columns), which need flag_modified to be detected as changed.
+    """
+    return frozenset(
+        key
+        for key, column in inspect(model_cls).columns.items()
+        if isinstance(column.type, (JSON, ARRAY, AESEncryptedColumn))
+    )
+
+
+class CursorParams(BaseModel):
+    """
+    Keyset pagination params, the cursor is the (time, id) of the last item of
+    the previous page, leave it empty to fetch the first page.
+    """
+
+    size: int = Field(default=50, ge=1, le=100)
+    cursor_time: Optional[datetime] = None
+    cursor_id: Optional[int | UUID] = None
+
+    @model_validator(mode="after")
+    def check_cursor(self) -> "CursorParams":
+        if (self.cursor_time is None) != (self.cursor_id is None):
+            raise ValueError("cursor_time and cursor_id must be provided together")
+        return self
+
+
+class IdCursorParams(BaseModel):
+    """
+    Keyset pagination params for the ids that are ordered by time already (e.g.
+    UUIDv7), the cursor is the id of the last item of the previous page, leave it
+    empty to fetch the first page.
+    """
+
+    size: int = Field(default=50, ge=1, le=100)
+    cursor_id: Optional[int | UUID] = None
+
+
+class CursorPage(BaseModel, Generic[T]):
+    # Allow the page of ORM objects to be validated as the response model.
+    model_config = ConfigDict(from_attributes=True)
+
+    items: List[T]
+    size: int
+    next_cursor_time: Optional[datetime] = None
+    next_cursor_id: Optional[int | UUID] = None
 
 
 class BaseRepo:
@@ -15,3 +103,70 @@ class BaseRepo:
         session.commit()
         session.refresh(obj)
         return obj
+
+    def apply_partial_update(
+        self,
+        obj: SQLModel,
+        partial_update: BaseModel,
+        exclude: Collection[str] = (),
+    ):
+        """
+        Set the fields explicitly set in the partial update to the object, which is
+        the same as model_dump(exclude_unset=True) without serializing the model.
+
+        Only the changed fields are set, and only the mutable fields are flagged as
+        modified, the scalar fields are tracked by SQLAlchemy already.
+        """
+        mutable_fields = get_mutable_fields(type(obj))
+        for field in partial_update.model_fields_set:
+            if field in exclude:
+                continue
+            value = getattr(partial_update, field)
+            if getattr(obj, field) == value:
+                continue
+            setattr(obj, field, value)
+            if field in mutable_fields:
+                flag_modified(obj, field)
+
+    def paginate_cursor(
+        self,
+        session: Session,
+        stmt: SelectOfScalar,
+        params: CursorParams | IdCursorParams,
+        time_column,
+        id_column,
+    ) -> CursorPage:
+        """
+        Paginate the statement by the (time, id) keyset in descending order, which
+        is an index range scan and skips the COUNT(*) of the offset pagination.
+
+        Pass IdCursorParams and None as the time column if the ids are already
+        ordered by time (e.g. UUIDv7), then the keyset is the id only.
+        """
+        if time_column is None:
+            if params.cursor_id is not None:
+                stmt = stmt.where(id_column < params.cursor_id)
+            stmt = stmt.order_by(id_column.desc())
+        else:
+            if params.cursor_id is not None:
+                stmt = stmt.where(
+                    tuple_(time_column, id_column)
+                    < tuple_(params.cursor_time, params.cursor_id)
+                )
+            stmt = stmt.order_by(time_column.desc(), id_column.desc())
+        stmt = stmt.limit(params.size + 1)
+        items = list(session.exec(stmt).all())
+
+        # Fetch one more item to know if there is a next page.
+        if len(items) <= params.size:
+            return CursorPage(items=items, size=params.size)
+        items = items[: params.size]
+        last_item = items[-1]
+        return CursorPage(
+            items=items,
+            size=params.size,
+            next_cursor_time=(
+                getattr(last_item, time_column.key) if time_column is not None else None
+            ),
+            next_cursor_id=getattr(last_item, id_column.key),
+        )
@@ -1,12 +1,11 @@
 from typing import Optional
 from datetime import datetime, UTC
 
-from sqlalchemy import func
-from sqlmodel import select, Session, update
+from sqlalchemy import case, exists
+from sqlmodel import select, Session, update, or_
 from app.exceptions import ChatEngineNotFound
 from fastapi_pagination import Params, Page
 from fastapi_pagination.ext.sqlmodel import paginate
-from sqlalchemy.orm.attributes import flag_modified
 
 from app.models.chat_engine import ChatEngine, ChatEngineUpdate
 from app.repositories.base_repo import BaseRepo
@@ -54,13 +53,13 @@ class ChatEngineRepo(BaseRepo):
         ).first()
 
     def has_default(self, session: Session) -> bool:
-        return (
-            session.scalar(
-                select(func.count(ChatEngine.id)).where(
+        # Stop at the first matched row instead of counting all of them.
+        return session.scalar(
+            select(
+                exists().where(
                     ChatEngine.is_default == True, ChatEngine.deleted_at == None
                 )
             )
-            > 0
         )
 
     def get_engine_by_name(self, session: Session, name: str) -> Optional[ChatEngine]:
@@ -71,13 +70,11 @@ class ChatEngineRepo(BaseRepo):
         ).first()
 
     def create(self, session: Session, obj: ChatEngine):
-        if obj.is_default:
-            session.exec(
-                update(ChatEngine)
-                .where(ChatEngine.id != obj.id)
-                .values(is_default=False)
-            )
         session.add(obj)
+        if obj.is_default:
+            # Flush to get the id of the new engine for flipping the default flag.
+            session.flush()
+            self._set_default(session, obj.id)
         session.commit()
         session.refresh(obj)
         return obj
@@ -89,20 +86,33 @@ class ChatEngineRepo(BaseRepo):
         chat_engine_update: ChatEngineUpdate,
     ) -> ChatEngine:
         set_default = chat_engine_update.is_default
-        for field, value in chat_engine_update.model_dump(exclude_unset=True).items():
-            setattr(chat_engine, field, value)
-            flag_modified(chat_engine, field)
+        self.apply_partial_update(
+            chat_engine,
+            chat_engine_update,
+            exclude=("is_default",) if set_default else (),
+        )
 
         if set_default:
-            session.exec(
-                update(ChatEngine)
-                .where(ChatEngine.id != chat_engine.id)
-                .values(is_default=False)
-            )
+            session.flush()
+            self._set_default(session, chat_engine.id)
         session.commit()
         session.refresh(chat_engine)
         return chat_engine
 
+    def _set_default(self, session: Session, chat_engine_id: int):
+        # Flip the default flag in a single statement, which locks the current
+        # default engine and the new one, so concurrent callers are serialized.
+        session.exec(
+            update(ChatEngine)
+            .where(
+                or_(ChatEngine.is_default == True, ChatEngine.id == chat_engine_id),
+            )
+            .values(
+                is_default=case((ChatEngine.id == chat_engine_id, True), else_=False),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
     def delete(self, session: Session, chat_engine: ChatEngine) -> ChatEngine:
         chat_engine.deleted_at = datetime.now(UTC)
         session.commit()
@@ -1,8 +1,9 @@
-from typing import Type
+from typing import Iterator, Type
+from uuid import UUID
 
 from sqlalchemy import func, delete
 from sqlmodel import Session, select, SQLModel
-from app.repositories.base_repo import BaseRepo
+from app.repositories.base_repo import BaseRepo, DELETE_BATCH_SIZE
 
 from app.models import (
     Document as DBDocument,
@@ -24,12 +25,11 @@ class ChunkRepo(BaseRepo):
     def get_documents_by_chunk_ids(
         self, session: Session, chunk_ids: list[str]
     ) -> list[DBDocument]:
-        stmt = select(DBDocument).where(
-            DBDocument.id.in_(
-                select(self.model_cls.document_id).where(
-                    self.model_cls.id.in_(chunk_ids),
-                )
-            ),
+        stmt = (
+            select(DBDocument)
+            .join(self.model_cls, self.model_cls.document_id == DBDocument.id)
+            .where(self.model_cls.id.in_(chunk_ids))
+            .distinct()
         )
         return list(session.exec(stmt).all())
 
@@ -38,22 +38,45 @@ class ChunkRepo(BaseRepo):
             select(self.model_cls).where(self.model_cls.document_id == document_id)
         ).all()
 
+    def iter_document_chunk_ids(
+        self, session: Session, document_id: int, batch_size: int = 256
+    ) -> Iterator[UUID]:
+        """
+        Stream the ids of the document chunks in batches, without loading the texts
+        and embeddings of the chunks into memory.
+        """
+        stmt = (
+            select(self.model_cls.id)
+            .where(self.model_cls.document_id == document_id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from session.exec(stmt)
+
     def fetch_by_document_ids(self, session: Session, document_ids: list[int]):
         return session.exec(
             select(self.model_cls).where(self.model_cls.document_id.in_(document_ids))
         ).all()
 
     def count(self, session: Session):
-        return session.scalar(select(func.count(self.model_cls.id)))
+        return session.scalar(select(func.count()).select_from(self.model_cls))
 
-    def delete_by_datasource(self, session: Session, datasource_id: int):
-        doc_ids_subquery = select(DBDocument.id).where(
-            DBDocument.data_source_id == datasource_id
+    def delete_by_datasource(
+        self, session: Session, datasource_id: int, batch_size: int = DELETE_BATCH_SIZE
+    ):
+        # MySQL doesn't support LIMIT in the multiple-table DELETE, so find a batch of
+        # chunk ids with the JOIN, then delete them by the primary key.
+        stmt = (
+            select(self.model_cls.id)
+            .join(DBDocument, DBDocument.id == self.model_cls.document_id)
+            .where(DBDocument.data_source_id == datasource_id)
+            .limit(batch_size)
         )
-        stmt = delete(self.model_cls).where(
-            self.model_cls.document_id.in_(doc_ids_subquery)
-        )
-        session.exec(stmt)
+        while True:
+            chunk_ids = session.exec(stmt).all()
+            if not chunk_ids:
+                break
+            session.exec(delete(self.model_cls).where(self.model_cls.id.in_(chunk_ids)))
+            session.commit()
 
     def delete_by_document(self, session: Session, document_id: int):
         stmt = delete(self.model_cls).where(self.model_cls.document_id == document_id)
@@ -7,7 +7,13 @@ from fastapi_pagination.ext.sqlmodel import paginate
 from app.api.admin_routes.knowledge_base.document.models import DocumentFilters
 from app.exceptions import DocumentNotFound
 from app.models import Document
-from app.repositories.base_repo import BaseRepo
+from app.repositories.base_repo import (
+    BaseRepo,
+    CursorPage,
+    CursorParams,
+    DELETE_BATCH_SIZE,
+    chunked,
+)
 
 
 class DocumentRepo(BaseRepo):
@@ -17,8 +23,8 @@ class DocumentRepo(BaseRepo):
         self,
         session: Session,
         filters: DocumentFilters,
-        params: Params | None = Params(),
-    ) -> Page[Document]:
+        params: Params | CursorParams | None = Params(),
+    ) -> Page[Document] | CursorPage[Document]:
         # build the select statement via conditions
         stmt = select(Document)
         if filters.knowledge_base_id:
@@ -55,6 +61,12 @@ class DocumentRepo(BaseRepo):
         if filters.index_status:
             stmt = stmt.where(Document.index_status == filters.index_status)
 
+        # Keyset pagination, which skips counting the filtered documents.
+        if isinstance(params, CursorParams):
+            return self.paginate_cursor(
+                session, stmt, params, Document.updated_at, Document.id
+            )
+
         # Make sure the newer edited record is always on top
         stmt = stmt.order_by(Document.updated_at.desc())
 
@@ -66,13 +78,40 @@ class DocumentRepo(BaseRepo):
             raise DocumentNotFound(doc_id)
         return doc
 
-    def delete_by_datasource(self, session: Session, datasource_id: int):
-        stmt = delete(Document).where(Document.data_source_id == datasource_id)
-        session.exec(stmt)
+    def delete_by_datasource(
+        self, session: Session, datasource_id: int, batch_size: int = DELETE_BATCH_SIZE
+    ):
+        stmt = (
+            delete(Document)
+            .where(Document.data_source_id == datasource_id)
+            .with_dialect_options(mysql_limit=batch_size)
+        )
+        while True:
+            result = session.exec(stmt)
+            session.commit()
+            if result.rowcount < batch_size:
+                break
 
     def fetch_by_ids(self, session: Session, document_ids: list[int]) -> list[Document]:
-        stmt = select(Document).where(Document.id.in_(document_ids))
-        return session.exec(stmt).all()
+        # Split the long IN-list into batches to keep each statement bounded.
+        documents = []
+        for batch_ids in chunked(document_ids):
+            stmt = select(Document).where(Document.id.in_(batch_ids))
+            documents.extend(session.exec(stmt).all())
+        return documents
+
+    def fetch_simple_by_ids(self, session: Session, document_ids: list[int]):
+        """
+        Fetch only the id, name and source_uri of the documents, without loading
+        the (potentially large) content and meta columns.
+        """
+        rows = []
+        for batch_ids in chunked(document_ids):
+            stmt = select(Document.id, Document.name, Document.source_uri).where(
+                Document.id.in_(batch_ids)
+            )
+            rows.extend(session.exec(stmt).all())
+        return rows
 
 
 document_repo = DocumentRepo()
@@ -2,8 +2,8 @@ from typing import Optional, Type
 
 from fastapi_pagination import Params, Page
 from fastapi_pagination.ext.sqlmodel import paginate
-from sqlalchemy.orm.attributes import flag_modified
-from sqlmodel import Session, select, update
+from sqlalchemy import case, exists
+from sqlmodel import Session, select, update, or_
 
 from app.api.admin_routes.embedding_model.models import (
     EmbeddingModelUpdate,
@@ -38,8 +38,7 @@ class EmbeddingModelRepo(BaseRepo):
         return db_embed_model
 
     def exists_any_model(self, session: Session) -> bool:
-        stmt = select(EmbeddingModel).with_for_update().limit(1)
-        return session.exec(stmt).one_or_none() is not None
+        return session.scalar(select(exists().select_from(EmbeddingModel)))
 
     def create(self, session: Session, create: EmbeddingModelCreate):
         # If there is currently no model, the first model will be
@@ -47,9 +46,6 @@ class EmbeddingModelRepo(BaseRepo):
         if not self.exists_any_model(session):
             create.is_default = True
 
-        if create.is_default:
-            self._unset_default(session)
-
         embed_model = EmbeddingModel(
             name=create.name,
             provider=create.provider,
@@ -60,6 +56,10 @@ class EmbeddingModelRepo(BaseRepo):
             is_default=create.is_default,
         )
         session.add(embed_model)
+        if create.is_default:
+            # Flush to get the id of the new model for flipping the default flag.
+            session.flush()
+            self._set_default(session, embed_model.id)
         session.commit()
         session.refresh(embed_model)
 
@@ -71,9 +71,7 @@ class EmbeddingModelRepo(BaseRepo):
         embed_model: EmbeddingModel,
         partial_update: EmbeddingModelUpdate,
     ) -> EmbeddingModel:
-        for field, value in partial_update.model_dump(exclude_unset=True).items():
-            setattr(embed_model, field, value)
-            flag_modified(embed_model, field)
+        self.apply_partial_update(embed_model, partial_update)
 
         session.commit()
         session.refresh(embed_model)
@@ -97,7 +95,7 @@ class EmbeddingModelRepo(BaseRepo):
         return session.exec(stmt).first()
 
     def has_default(self, session: Session) -> bool:
-        return self.get_default(session) is not None
+        return session.scalar(select(exists().where(EmbeddingModel.is_default == True)))
 
     def must_get_default(self, session: Session) -> Type[EmbeddingModel]:
         embed_model = self.get_default(session)
@@ -105,17 +103,22 @@ class EmbeddingModelRepo(BaseRepo):
             raise DefaultEmbeddingModelNotFound()
         return embed_model
 
-    def _unset_default(self, session: Session):
+    def _set_default(self, session: Session, model_id: int):
+        # Flip the default flag in a single statement, which locks the current
+        # default model and the new one, so concurrent callers are serialized.
         session.exec(
             update(EmbeddingModel)
-            .values(is_default=False)
-            .where(EmbeddingModel.is_default == True)
+            .where(
+                or_(EmbeddingModel.is_default == True, EmbeddingModel.id == model_id),
+            )
+            .values(
+                is_default=case((EmbeddingModel.id == model_id, True), else_=False),
+            )
+            .execution_options(synchronize_session=False)
         )
 
     def set_default(self, session: Session, model: EmbeddingModel):
-        self._unset_default(session)
-        model.is_default = True
-        flag_modified(model, "is_default")
+        self._set_default(session, model.id)
         session.commit()
         session.refresh(model)
         return model
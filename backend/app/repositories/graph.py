@@ -21,10 +21,10 @@ class GraphRepo:
         self.chunk_model = chunk_model
 
     def count_entities(self, session: Session):
-        return session.scalar(select(func.count(self.entity_model.id)))
+        return session.scalar(select(func.count()).select_from(self.entity_model))
 
     def count_relationships(self, session: Session):
-        return session.scalar(select(func.count(self.relationship_model.id)))
+        return session.scalar(select(func.count()).select_from(self.relationship_model))
 
     def delete_orphaned_entities(self, session: Session):
         orphaned_entity_ids = (
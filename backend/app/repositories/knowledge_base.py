@@ -115,14 +115,16 @@ class KnowledgeBaseRepo(BaseRepo):
 
     def count_data_sources(self, session: Session, kb: KnowledgeBase) -> int:
         return session.scalar(
-            select(func.count(KnowledgeBaseDataSource.data_source_id)).where(
-                KnowledgeBaseDataSource.knowledge_base_id == kb.id
-            )
+            select(func.count())
+            .select_from(KnowledgeBaseDataSource)
+            .where(KnowledgeBaseDataSource.knowledge_base_id == kb.id)
         )
 
     def count_documents(self, session: Session, kb: KnowledgeBase) -> int:
         return session.scalar(
-            select(func.count(Document.id)).where(Document.knowledge_base_id == kb.id)
+            select(func.count())
+            .select_from(Document)
+            .where(Document.knowledge_base_id == kb.id)
         )
 
     def count_chunks(self, session: Session, kb: KnowledgeBase):
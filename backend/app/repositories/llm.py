@@ -3,9 +3,8 @@ from typing import Type, Optional
 from fastapi import Depends
 from fastapi_pagination import Params, Page
 from fastapi_pagination.ext.sqlmodel import paginate
-from sqlalchemy import update
-from sqlalchemy.orm.attributes import flag_modified
-from sqlmodel import select, Session
+from sqlalchemy import case, exists, update
+from sqlmodel import or_, select, Session
 
 from app.exceptions import DefaultLLMNotFound, LLMNotFound
 from app.models import LLM, LLMUpdate
@@ -16,6 +15,8 @@ from app.repositories.base_repo import BaseRepo
 
 class LLMRepo(BaseRepo):
     model_cls: LLM
+    # The id of the default llm last seen by this process.
+    _default_llm_id: Optional[int] = None
 
     def paginate(self, session: Session, params: Params = Depends()) -> Page[LLM]:
         query = select(LLM)
@@ -33,8 +34,7 @@ class LLMRepo(BaseRepo):
         return db_llm
 
     def exists_any_model(self, session: Session) -> bool:
-        stmt = select(LLM).with_for_update().limit(1)
-        return session.exec(stmt).one_or_none() is not None
+        return session.scalar(select(exists().select_from(LLM)))
 
     def create(self, session: Session, llm: LLM) -> LLM:
         # If there is no exiting model, the first model is
@@ -42,20 +42,19 @@ class LLMRepo(BaseRepo):
         if not self.exists_any_model(session):
             llm.is_default = True
 
-        if llm.is_default:
-            self._unset_default(session)
-
         llm.id = None
         session.add(llm)
+        if llm.is_default:
+            # Flush to get the id of the new model for flipping the default flag.
+            session.flush()
+            self._set_default(session, llm.id)
         session.commit()
         session.refresh(llm)
 
         return llm
 
     def update(self, session: Session, llm: LLM, llm_update: LLMUpdate) -> LLM:
-        for field, value in llm_update.model_dump(exclude_unset=True).items():
-            setattr(llm, field, value)
-            flag_modified(llm, field)
+        self.apply_partial_update(llm, llm_update)
 
         session.commit()
         session.refresh(llm)
@@ -64,16 +63,25 @@ class LLMRepo(BaseRepo):
     # Default model
 
     def get_default(self, session: Session) -> Type[LLM] | None:
+        # Try the primary key lookup of the cached default llm first, the flag is
+        # checked since the default llm may have been changed by other processes.
+        if self._default_llm_id is not None:
+            db_llm = session.get(LLM, self._default_llm_id)
+            if db_llm is not None and db_llm.is_default:
+                return db_llm
+
         stmt = (
             select(LLM)
             .where(LLM.is_default == True)
             .order_by(LLM.updated_at.desc())
             .limit(1)
         )
-        return session.exec(stmt).first()
+        db_llm = session.exec(stmt).first()
+        self._default_llm_id = db_llm.id if db_llm is not None else None
+        return db_llm
 
     def has_default(self, session: Session) -> bool:
-        return self.get_default(session) is not None
+        return session.scalar(select(exists().where(LLM.is_default == True)))
 
     def must_get_default(self, session: Session) -> Type[LLM]:
         db_llm = self.get_default(session)
@@ -81,13 +89,18 @@ class LLMRepo(BaseRepo):
             raise DefaultLLMNotFound()
         return db_llm
 
-    def _unset_default(self, session: Session):
-        session.exec(update(LLM).values(is_default=False))
+    def _set_default(self, session: Session, llm_id: int):
+        # Flip the default flag in a single statement, which locks the current
+        # default model and the new one, so concurrent callers are serialized.
+        session.exec(
+            update(LLM)
+            .where(or_(LLM.is_default == True, LLM.id == llm_id))
+            .values(is_default=case((LLM.id == llm_id, True), else_=False))
+            .execution_options(synchronize_session=False)
+        )
 
     def set_default(self, session: Session, llm: LLM) -> LLM:
-        self._unset_default(session)
-        llm.is_default = True
-        session.add(llm)
+        self._set_default(session, llm.id)
         session.commit()
         session.refresh(llm)
         return llm
@@ -2,9 +2,8 @@ from typing import Optional
 
 from fastapi_pagination import Params, Page
 from fastapi_pagination.ext.sqlmodel import paginate
-from sqlalchemy import update
-from sqlalchemy.orm.attributes import flag_modified
-from sqlmodel import Session, select
+from sqlalchemy import case, exists, update
+from sqlmodel import Session, select, or_
 
 from app.exceptions import RerankerModelNotFound, DefaultRerankerModelNotFound
 from app.models import RerankerModel
@@ -15,6 +14,8 @@ from app.repositories.base_repo import BaseRepo
 
 class RerankerModelRepo(BaseRepo):
     model_cls: RerankerModel
+    # The id of the default reranker model last seen by this process.
+    _default_model_id: Optional[int] = None
 
     def paginate(
         self, session: Session, params: Params | None = Params()
@@ -36,8 +37,7 @@ class RerankerModelRepo(BaseRepo):
         return db_model
 
     def exists_any_model(self, session: Session) -> bool:
-        stmt = select(RerankerModel).with_for_update().limit(1)
-        return session.exec(stmt).one_or_none() is not None
+        return session.scalar(select(exists().select_from(RerankerModel)))
 
     def create(self, session: Session, reranker_model: RerankerModel) -> RerankerModel:
         # If there is no exiting model, the first model will be
@@ -45,11 +45,12 @@ class RerankerModelRepo(BaseRepo):
         if not self.exists_any_model(session):
             reranker_model.is_default = True
 
-        if reranker_model.is_default:
-            self.unset_default(session)
-
         reranker_model.id = None
         session.add(reranker_model)
+        if reranker_model.is_default:
+            # Flush to get the id of the new model for flipping the default flag.
+            session.flush()
+            self._set_default(session, reranker_model.id)
         session.commit()
         session.refresh(reranker_model)
 
@@ -61,9 +62,7 @@ class RerankerModelRepo(BaseRepo):
         reranker_model: RerankerModel,
         model_update: RerankerModelUpdate,
     ) -> RerankerModel:
-        for field, value in model_update.model_dump(exclude_unset=True).items():
-            setattr(reranker_model, field, value)
-            flag_modified(reranker_model, field)
+        self.apply_partial_update(reranker_model, model_update)
 
         session.commit()
         session.refresh(reranker_model)
@@ -71,10 +70,12 @@ class RerankerModelRepo(BaseRepo):
 
     def delete(self, db_session: Session, reranker_model: RerankerModel):
         # TODO: Support to specify a new reranker model to replace the current reranker model.
+        # The session is expired on commit, no need to sync the loaded chat engines.
         db_session.exec(
             update(ChatEngine)
             .where(ChatEngine.reranker_id == reranker_model.id)
             .values(reranker_id=None)
+            .execution_options(synchronize_session=False)
         )
 
         db_session.delete(reranker_model)
@@ -83,11 +84,20 @@ class RerankerModelRepo(BaseRepo):
     # Default model
 
     def get_default(self, session: Session) -> Optional[RerankerModel]:
+        # Try the primary key lookup of the cached default model first, the flag is
+        # checked since the default model may have been changed by other processes.
+        if self._default_model_id is not None:
+            db_model = session.get(RerankerModel, self._default_model_id)
+            if db_model is not None and db_model.is_default:
+                return db_model
+
         stmt = select(RerankerModel).where(RerankerModel.is_default == True).limit(1)
-        return session.exec(stmt).first()
+        db_model = session.exec(stmt).first()
+        self._default_model_id = db_model.id if db_model is not None else None
+        return db_model
 
     def has_default(self, session: Session) -> bool:
-        return self.get_default(session) is not None
+        return session.scalar(select(exists().where(RerankerModel.is_default == True)))
 
     def must_get_default(self, session: Session) -> RerankerModel:
         db_reranker_model = self.get_default(session)
@@ -95,13 +105,20 @@ class RerankerModelRepo(BaseRepo):
             raise DefaultRerankerModelNotFound()
         return db_reranker_model
 
-    def unset_default(self, session: Session):
-        session.exec(update(RerankerModel).values(is_default=False))
+    def _set_default(self, session: Session, model_id: int):
+        # Flip the default flag in a single statement, which locks the current
+        # default model and the new one, so concurrent callers are serialized.
+        session.exec(
+            update(RerankerModel)
+            .where(or_(RerankerModel.is_default == True, RerankerModel.id == model_id))
+            .values(
+                is_default=case((RerankerModel.id == model_id, True), else_=False),
+            )
+            .execution_options(synchronize_session=False)
+        )
 
     def set_default(self, session: Session, model: RerankerModel):
-        self.unset_default(session)
-        model.is_default = True
-        flag_modified(model, "is_default")
+        self._set_default(session, model.id)
         session.commit()
         session.refresh(model)
         return model
@@ -3,7 +3,7 @@ from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlmodel import paginate
 from sqlmodel import Session, select
 from app.models.auth import User
-from app.repositories.base_repo import BaseRepo
+from app.repositories.base_repo import BaseRepo, CursorPage, IdCursorParams
 
 
 class UserRepo(BaseRepo):
@@ -13,12 +13,23 @@ class UserRepo(BaseRepo):
         self,
         db_session: Session,
         search: Optional[str] = None,
-        params: Params = Params(),
-    ) -> Page[User]:
+        params: Params | IdCursorParams = Params(),
+        contains: bool = False,
+    ) -> Page[User] | CursorPage[User]:
         query = select(User)
 
         if search:
-            query = query.where(User.email.ilike(f"%{search}%"))
+            # Match the email prefix by default, set `contains` to match a
+            # substring anywhere in the email, which scans the whole table.
+            if contains:
+                query = query.where(User.email.ilike(f"%{search}%"))
+            else:
+                query = query.where(User.email.ilike(f"{search}%"))
+
+        # Keyset pagination, which skips counting the matched users. The user ids
+        # are UUIDv7, which are ordered by the creation time already.
+        if isinstance(params, IdCursorParams):
+            return self.paginate_cursor(db_session, query, params, None, User.id)
 
         query = query.order_by(User.id)
         return paginate(
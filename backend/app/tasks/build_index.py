@@ -87,9 +87,8 @@ def build_index_for_document(self, knowledge_base_id: int, document_id: int):
             return
 
         chunk_repo = ChunkRepo(get_kb_chunk_model(kb))
-        chunks = chunk_repo.get_document_chunks(session, document_id)
-        for chunk in chunks:
-            build_kg_index_for_chunk.delay(knowledge_base_id, chunk.id)
+        for chunk_id in chunk_repo.iter_document_chunk_ids(session, document_id):
+            build_kg_index_for_chunk.delay(knowledge_base_id, chunk_id)
 
 
 @celery_app.task
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from typing import Optional
 
 
+@lru_cache(maxsize=256)
 def format_namespace(namespace: Optional[str] = None) -> str:
     return namespace.replace("-", "_") if namespace else ""
@@ -1,3 +1,4 @@
+import inspect
 import threading
 from functools import wraps
 
@@ -28,9 +29,28 @@ def singleflight_cache(func):
     _locks = {}
     _locks_lock = threading.Lock()
 
+    signature = inspect.signature(func)
+    num_params = len(signature.parameters)
+    has_var_params = any(
+        p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+        for p in signature.parameters.values()
+    )
+
+    def make_key(args, kwargs):
+        # Fast path: all the arguments are passed positionally.
+        if not kwargs and len(args) == num_params:
+            return args
+        if has_var_params:
+            return args + tuple(sorted(kwargs.items()))
+        # Bind the arguments in the parameter order, so that passing an argument
+        # by position or by keyword, or omitting a default, hits the same entry.
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.values())
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        key = args + tuple(sorted(kwargs.items()))
+        key = make_key(args, kwargs)
         if key in _cache:
             return _cache[key]
         with _locks_lock:
@@ -40,6 +60,10 @@ def singleflight_cache(func):
                 return _cache[key]
             result = func(*args, **kwargs)
             _cache[key] = result
-            return result
+        # Once the value is cached, later calls return on the fast path, so the
+        # lock of the key is no longer needed.
+        with _locks_lock:
+            _locks.pop(key, None)
+        return result
 
     return wrapper
@@ -13,16 +13,15 @@ class LangfuseContextManager:
 
     @contextmanager
     def observe(self, **kwargs):
+        # The events are sent by the background thread of the Langfuse client in
+        # batches (and flushed at exit), no need to block the response on flushing.
         try:
             self.instrumentor.start()
             with self.instrumentor.observe(**kwargs) as trace_client:
                 trace_client.update(name=kwargs.get("trace_name"), **kwargs)
                 self.langfuse_client = trace_client
                 yield trace_client
-        except Exception:
-            raise
         finally:
-            self.instrumentor.flush()
             self.instrumentor.stop()
 
     @contextmanager
@@ -35,25 +34,18 @@ class LangfuseContextManager:
             client = self.langfuse_client
         span = client.span(**kwargs)
 
-        ctx = langfuse_instrumentor_context.get().copy()
+        # Only swap the parent observation id of the context in place, there is no
+        # need to copy and restore the whole context.
+        ctx = langfuse_instrumentor_context.get()
         old_parent_observation_id = ctx.get("parent_observation_id")
-        langfuse_instrumentor_context.get().update(
-            {
-                "parent_observation_id": span.id,
-            }
-        )
+        ctx["parent_observation_id"] = span.id
 
         try:
             yield span
-        except Exception:
-            raise
         finally:
-            ctx.update(
-                {
-                    "parent_observation_id": old_parent_observation_id,
-                }
+            langfuse_instrumentor_context.get()["parent_observation_id"] = (
+                old_parent_observation_id
             )
-            langfuse_instrumentor_context.get().update(ctx)
 
     @property
     def trace_id(self) -> Optional[str]:
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from app.repositories.base_repo import BaseRepo, CursorParams, IdCursorParams
+
+
+class CursorItem(SQLModel, table=True):
+    id: int = Field(primary_key=True)
+    updated_at: datetime
+
+    __tablename__ = "test_cursor_items"
+
+
+T0 = datetime(2025, 1, 1)
+
+# Items 2 to 5 share the same updated_at, which the id breaks the tie of.
+ITEMS = [
+    (1, T0),
+    (2, T0 + timedelta(minutes=1)),
+    (3, T0 + timedelta(minutes=1)),
+    (4, T0 + timedelta(minutes=1)),
+    (5, T0 + timedelta(minutes=1)),
+    (6, T0 + timedelta(minutes=2)),
+    (7, T0 + timedelta(minutes=3)),
+]
+EXPECTED_IDS = [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[CursorItem.__table__])
+    with Session(engine) as session:
+        session.add_all([CursorItem(id=i, updated_at=t) for i, t in ITEMS])
+        session.commit()
+        yield session
+
+
+def paginate_all(session, size, time_column=CursorItem.updated_at):
+    repo = BaseRepo()
+    pages = []
+    params = CursorParams(size=size) if time_column else IdCursorParams(size=size)
+    while True:
+        page = repo.paginate_cursor(
+            session, select(CursorItem), params, time_column, CursorItem.id
+        )
+        pages.append([item.id for item in page.items])
+        if page.next_cursor_id is None:
+            return pages
+        if time_column is None:
+            params = IdCursorParams(size=size, cursor_id=page.next_cursor_id)
+        else:
+            params = CursorParams(
+                size=size,
+                cursor_time=page.next_cursor_time,
+                cursor_id=page.next_cursor_id,
+            )
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 6])
+def test_paginate_cursor_breaks_ties_by_id(session, size):
+    pages = paginate_all(session, size)
+
+    assert [i for page in pages for i in page] == EXPECTED_IDS
+    assert all(len(page) == size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= size
+
+
+def test_paginate_cursor_last_full_page_has_no_next_cursor(session):
+    # 7 items fit exactly in one page of size 7, no empty page follows.
+    assert paginate_all(session, 7) == [EXPECTED_IDS]
+
+
+def test_paginate_cursor_page_boundary(session):
+    page = BaseRepo().paginate_cursor(
+        session,
+        select(CursorItem),
+        CursorParams(size=3),
+        CursorItem.updated_at,
+        CursorItem.id,
+    )
+
+    assert [item.id for item in page.items] == [7, 6, 5]
+    assert page.next_cursor_time == T0 + timedelta(minutes=1)
+    assert page.next_cursor_id == 5
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 10])
+def test_paginate_cursor_by_id(session, size):
+    pages = paginate_all(session, size, time_column=None)
+
+    assert [i for page in pages for i in page] == EXPECTED_IDS
+
+
+def test_cursor_params_require_both_cursor_fields():
+    with pytest.raises(ValidationError):
+        CursorParams(cursor_id=1)
+    with pytest.raises(ValidationError):
+        CursorParams(cursor_time=T0)
+
+    params = CursorParams(cursor_time=T0, cursor_id=1)
+    assert params.cursor_time == T0
+    assert params.cursor_id == 1
@@ -0,0 +1,91 @@
+import pytest
+
+from app.rag.retrievers import semantic_cache as semantic_cache_module
+from app.rag.retrievers.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(semantic_cache_module.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_get_hits_above_threshold():
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0], "query", "value", ttl_secs=60, max_entries=10)
+
+    assert cache.get("ns", [1.0, 0.0], 0.9) == "value"
+    # Scaled vectors have the same direction.
+    assert cache.get("ns", [2.0, 0.0], 0.9) == "value"
+    assert cache.get("ns", [0.9, 0.1], 0.9) == "value"
+
+
+def test_get_misses_below_threshold():
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0], "query", "value", ttl_secs=60, max_entries=10)
+
+    assert cache.get("ns", [0.0, 1.0], 0.9) is None
+    assert cache.get("ns", [1.0, 1.0], 0.9) is None
+    assert cache.get("ns", [0.0, 0.0], 0.0) is None
+
+
+def test_get_returns_the_most_similar_entry():
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0], "a", "a", ttl_secs=60, max_entries=10)
+    cache.put("ns", [0.0, 1.0], "b", "b", ttl_secs=60, max_entries=10)
+
+    assert cache.get("ns", [0.2, 1.0], 0.5) == "b"
+    assert cache.get("ns", [1.0, 0.2], 0.5) == "a"
+
+
+def test_entries_expire_after_ttl(now):
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0], "query", "value", ttl_secs=60, max_entries=10)
+
+    now[0] += 59
+    assert cache.get("ns", [1.0, 0.0], 0.9) == "value"
+    now[0] += 1
+    assert cache.get("ns", [1.0, 0.0], 0.9) is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0, 0.0], "a", "a", ttl_secs=60, max_entries=2)
+    cache.put("ns", [0.0, 1.0, 0.0], "b", "b", ttl_secs=60, max_entries=2)
+    # Use a, so that b becomes the least recently used entry.
+    assert cache.get("ns", [1.0, 0.0, 0.0], 0.9) == "a"
+    cache.put("ns", [0.0, 0.0, 1.0], "c", "c", ttl_secs=60, max_entries=2)
+
+    assert cache.get("ns", [1.0, 0.0, 0.0], 0.9) == "a"
+    assert cache.get("ns", [0.0, 1.0, 0.0], 0.9) is None
+    assert cache.get("ns", [0.0, 0.0, 1.0], 0.9) == "c"
+
+
+def test_eviction_spans_namespaces():
+    cache = SemanticCache()
+    cache.put("ns1", [1.0, 0.0], "a", "a", ttl_secs=60, max_entries=2)
+    cache.put("ns2", [1.0, 0.0], "b", "b", ttl_secs=60, max_entries=2)
+    cache.put("ns2", [0.0, 1.0], "c", "c", ttl_secs=60, max_entries=2)
+
+    assert cache.get("ns1", [1.0, 0.0], 0.9) is None
+    assert cache.get("ns2", [1.0, 0.0], 0.9) == "b"
+    assert cache.get("ns2", [0.0, 1.0], 0.9) == "c"
+
+
+def test_namespaces_are_isolated():
+    cache = SemanticCache()
+    cache.put(("kb", 1), [1.0, 0.0], "query", "kb1", ttl_secs=60, max_entries=10)
+
+    assert cache.get(("kb", 2), [1.0, 0.0], 0.9) is None
+    cache.put(("kb", 2), [1.0, 0.0], "query", "kb2", ttl_secs=60, max_entries=10)
+    assert cache.get(("kb", 1), [1.0, 0.0], 0.9) == "kb1"
+    assert cache.get(("kb", 2), [1.0, 0.0], 0.9) == "kb2"
+
+
+def test_clear():
+    cache = SemanticCache()
+    cache.put("ns", [1.0, 0.0], "query", "value", ttl_secs=60, max_entries=10)
+    cache.clear()
+
+    assert cache.get("ns", [1.0, 0.0], 0.9) is None
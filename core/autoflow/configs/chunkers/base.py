@@ -2,6 +2,8 @@ from typing import Optional, Dict
 
 from pydantic import BaseModel, Field, model_validator
 
+from autoflow.utils.imports import import_class
+
 
 class ChunkerConfig(BaseModel):
     provider: str = Field(
@@ -25,11 +27,9 @@ class ChunkerConfig(BaseModel):
         if provider not in self._provider_configs:
             raise ValueError(f"Unsupported chunker provider: {provider}")
 
-        module = __import__(
-            f"autoflow.configs.chunkers.{provider}",
-            fromlist=[self._provider_configs[provider]],
+        config_class = import_class(
+            f"autoflow.configs.chunkers.{provider}", self._provider_configs[provider]
         )
-        config_class = getattr(module, self._provider_configs[provider])
 
         if config is None:
             config = {}
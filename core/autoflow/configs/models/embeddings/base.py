@@ -1,11 +1,14 @@
 from typing import Optional, Dict
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, model_validator, ConfigDict
 
 from autoflow.configs.models.providers import ModelProviders
+from autoflow.utils.imports import import_class
 
 
 class EmbeddingModelConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     provider: ModelProviders = Field(
         description="Provider of the embedding_models models (e.g., 'openai')",
         default=ModelProviders.OPENAI,
@@ -28,11 +31,10 @@ class EmbeddingModelConfig(BaseModel):
         if provider not in self._provider_configs:
             raise ValueError(f"Unsupported embedding_models provider: {provider}")
 
-        module = __import__(
+        config_class = import_class(
             f"autoflow.configs.models.embeddings.{provider}",
-            fromlist=[self._provider_configs[provider]],
+            self._provider_configs[provider],
         )
-        config_class = getattr(module, self._provider_configs[provider])
 
         if config is None:
             config = {}
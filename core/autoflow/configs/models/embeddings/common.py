@@ -1,9 +1,11 @@
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class BaseEmbeddingConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     model: str = Field(
         description="The model to use for the embedding",
         default="text-embedding-3-small",
@@ -1,13 +1,16 @@
 from typing import Optional, Dict
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, model_validator, ConfigDict
 
 from autoflow.configs.models.providers import ModelProviders
+from autoflow.utils.imports import import_class
 
 DEFAULT_TEMPERATURE = 0.1
 
 
 class LLMConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     provider: ModelProviders = Field(
         description="Provider of the large language models (LLM) (e.g., 'openai')",
         default=ModelProviders.OPENAI,
@@ -29,11 +32,9 @@ class LLMConfig(BaseModel):
         if provider not in self._llm_configs:
             raise ValueError(f"Unsupported llm provider: {provider}")
 
-        module = __import__(
-            f"autoflow.configs.models.llms.{provider}",
-            fromlist=[self._llm_configs[provider]],
+        config_class = import_class(
+            f"autoflow.configs.models.llms.{provider}", self._llm_configs[provider]
         )
-        config_class = getattr(module, self._llm_configs[provider])
 
         if config is None:
             config = {}
@@ -1,9 +1,11 @@
 from typing import Optional
 
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, ConfigDict
 
 
 class BaseLLMConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     model: str = Field(
         description="The model to use for the LLM",
         default="gpt-4o",
@@ -1,9 +1,11 @@
 from typing import Dict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 from autoflow.configs.models.providers import ProviderConfig
 
 
 class ManagerConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     providers: Dict[str, ProviderConfig] = Field(default_factory=dict)
@@ -1,20 +1,39 @@
+from functools import lru_cache
+from typing import Dict, List
+
 from autoflow.configs.models.providers.base import (
     ModelProviders,
     ModelProviderInfo,
     ProviderConfig,
 )
 
-model_providers = [
-    ModelProviderInfo(
-        name=ModelProviders.OPENAI,
-        display_name="OpenAI",
-        description="The OpenAI API provides a simple interface for developers to create an intelligence layer in their applications, powered by OpenAI's state of the art models.",
-        website="https://platform.openai.com",
-        supported_model_types=["llm", "text_embedding"],
-    )
-]
 
-model_provider_mappings = {provider.name: provider for provider in model_providers}
+@lru_cache(maxsize=None)
+def get_model_providers() -> List[ModelProviderInfo]:
+    return [
+        ModelProviderInfo(
+            name=ModelProviders.OPENAI,
+            display_name="OpenAI",
+            description="The OpenAI API provides a simple interface for developers to create an intelligence layer in their applications, powered by OpenAI's state of the art models.",
+            website="https://platform.openai.com",
+            supported_model_types=["llm", "text_embedding"],
+        )
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_model_provider_mappings() -> Dict[ModelProviders, ModelProviderInfo]:
+    return {provider.name: provider for provider in get_model_providers()}
+
+
+def __getattr__(name: str):
+    # Build the provider list on first access instead of at import.
+    if name == "model_providers":
+        return get_model_providers()
+    if name == "model_provider_mappings":
+        return get_model_provider_mappings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "ModelProviders",
@@ -1,6 +1,6 @@
 from typing import Optional, Literal, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from litellm import LlmProviders
 
 ModelProviders = LlmProviders
@@ -30,6 +30,8 @@ class ModelProviderInfo(BaseModel):
 
 
 class ProviderConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     api_key: Optional[str] = Field(
         title="API key",
         default=None,
@@ -1,10 +1,13 @@
 from typing import Optional, Dict
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, model_validator, ConfigDict
 from autoflow.configs.models.providers import ModelProviders
+from autoflow.utils.imports import import_class
 
 
 class RerankerConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     provider: ModelProviders = Field(
         description="Provider of the reranker models (e.g., 'openai')",
         default=ModelProviders.OPENAI,
@@ -26,11 +29,10 @@ class RerankerConfig(BaseModel):
         if provider not in self._provider_configs:
             raise ValueError(f"Unsupported reranker provider: {provider}")
 
-        module = __import__(
+        config_class = import_class(
             f"autoflow.configs.models.rerankers.{provider}",
-            fromlist=[self._provider_configs[provider]],
+            self._provider_configs[provider],
         )
-        config_class = getattr(module, self._provider_configs[provider])
 
         if config is None:
             config = {}
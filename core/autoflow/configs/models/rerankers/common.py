@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class BaseRerankerConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     model: str = Field(
         description="The model to use for the reranker",
         default="jina-reranker-v2-base-multilingual",
@@ -1,5 +1,6 @@
 from enum import Enum
 import os
+import re
 from typing import IO, Optional, Union, BinaryIO, TextIO
 from urllib.parse import urlparse
 
@@ -17,6 +18,13 @@ class DataType(str, Enum):
 
 def guess_datatype(source: Union[str, IO, BinaryIO, TextIO]) -> Optional[DataType]:
     if isinstance(source, str):
+        # Fast path for plain file paths, which have no scheme to parse. Cut the
+        # query string and fragment like urlparse would.
+        if ":" not in source:
+            return guess_by_filename(_URL_QUERY_RE.split(source, maxsplit=1)[0])
+        if source.startswith(("http://", "https://")):
+            return DataType.HTML
+
         url = urlparse(source)
         if url.scheme == "" or url.scheme == "file":
             return guess_by_filename(url.path)
@@ -32,24 +40,33 @@ def guess_datatype(source: Union[str, IO, BinaryIO, TextIO]) -> Optional[DataTyp
         return None
 
 
+_SUFFIX_DATATYPES = {
+    ".md": DataType.MARKDOWN,
+    ".pdf": DataType.PDF,
+    ".docx": DataType.DOCX,
+    ".pptx": DataType.PPTX,
+    ".xlsx": DataType.XLSX,
+    ".csv": DataType.CSV,
+    ".html": DataType.HTML,
+    ".htm": DataType.HTML,
+}
+
+
+# The start of the query string or fragment of a URL.
+_URL_QUERY_RE = re.compile(r"[?#]")
+
+# The suffix of a URL path followed by a query string or fragment.
+_URL_SUFFIX_RE = re.compile(r"(\.[a-z0-9]{1,5})[?#]")
+
+
 def guess_by_filename(filename: str) -> Optional[DataType]:
     """Helper function to guess data type from filename."""
     lower = filename.lower()
-    if lower.endswith(".md"):
-        return DataType.MARKDOWN
-    elif lower.endswith(".pdf"):
-        return DataType.PDF
-    elif lower.endswith(".docx"):
-        return DataType.DOCX
-    elif lower.endswith(".pptx"):
-        return DataType.PPTX
-    elif lower.endswith(".xlsx"):
-        return DataType.XLSX
-    elif lower.endswith(".csv"):
-        return DataType.CSV
-    elif lower.endswith(".xml") and "sitemap" in lower:
-        return DataType.SITEMAP
-    elif lower.endswith((".html", ".htm")):
-        return DataType.HTML
-    else:
-        return None
+    suffix = lower[lower.rfind(".") :] if "." in lower else ""
+    if suffix not in _SUFFIX_DATATYPES and suffix != ".xml":
+        match = _URL_SUFFIX_RE.search(lower)
+        if match:
+            suffix = match.group(1)
+    if suffix == ".xml":
+        return DataType.SITEMAP if "sitemap" in lower else None
+    return _SUFFIX_DATATYPES.get(suffix)
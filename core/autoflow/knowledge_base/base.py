@@ -1,7 +1,8 @@
 import logging
+import threading
 import uuid
+from collections import deque
 from typing import List, Optional, Any
-from functools import partial
 from os import cpu_count
 from concurrent.futures import ThreadPoolExecutor
 
@@ -22,7 +23,7 @@ from autoflow.models.embedding_models import EmbeddingModel
 from autoflow.models.llms.dspy import get_dspy_lm_by_llm
 from autoflow.models.rerank_models import RerankModel
 from autoflow.types import BaseComponent, SearchMode
-from autoflow.storage.doc_store import DocumentSearchResult, Document
+from autoflow.storage.doc_store import Chunk, DocumentSearchResult, Document
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ class KnowledgeBase(BaseComponent):
         embedding_model: Optional[EmbeddingModel] = None,
         rerank_model: Optional[RerankModel] = None,
         max_workers: Optional[int] = None,
+        kg_extraction_concurrency: Optional[int] = None,
     ):
         super().__init__(
             namespace=namespace,
@@ -59,6 +61,11 @@ class KnowledgeBase(BaseComponent):
         self._init_stores()
         self._init_indexes()
         self._max_workers = max_workers or cpu_count()
+        # Limit the LLM calls of the knowledge graph extraction across all the
+        # documents being indexed, each document extracts its chunks in parallel.
+        self._kg_extraction_semaphore = threading.BoundedSemaphore(
+            kg_extraction_concurrency or self._max_workers
+        )
 
     def _init_stores(self):
         from autoflow.storage.doc_store.tidb_doc_store import TiDBDocumentStore
@@ -109,16 +116,23 @@ class KnowledgeBase(BaseComponent):
         if loader is None:
             loader = get_loader_for_datatype(data_type)
 
-        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
-            build_index_for_document = partial(
-                self.build_index_for_document, chunker=chunker
-            )
-
-            results = executor.map(build_index_for_document, loader.load(source))
-
+        # Load the next documents while the previous ones are being indexed, the
+        # number of documents in flight is bounded, so that the loader does not
+        # run ahead and keep the whole source in memory (executor.map would).
         return_documents = []
-        for result in results:
-            return_documents.append(result)
+        pending = deque()
+        max_pending = self._max_workers * 2
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for document in loader.load(source):
+                if len(pending) >= max_pending:
+                    return_documents.append(pending.popleft().result())
+                pending.append(
+                    executor.submit(
+                        self.build_index_for_document, document, chunker=chunker
+                    )
+                )
+            while pending:
+                return_documents.append(pending.popleft().result())
         return return_documents
 
     def build_index_for_document(
@@ -136,24 +150,56 @@ class KnowledgeBase(BaseComponent):
         Returns:
             A list of documents that are the result of indexing the original document.
         """
-        # TODO: handle duplicate documents.
-        if chunker is None:
-            chunker = get_chunker_for_datatype(document.data_type)
+        # Skip chunking and embedding the documents that have been indexed with
+        # the same content, the knowledge graph index below skips the chunks that
+        # have been extracted, so an interrupted extraction is resumed.
+        indexed_document = self._get_indexed_document(document)
+        if indexed_document is not None:
+            logger.info(
+                "Document %s has been indexed as document %s, skip chunking.",
+                document.id,
+                indexed_document.id,
+            )
+            chunked_document = indexed_document
+        else:
+            if chunker is None:
+                chunker = get_chunker_for_datatype(document.data_type)
 
-        chunked_document = chunker.chunk(document)
-        self.add_document(chunked_document)
+            chunked_document = chunker.chunk(document)
+            self.add_document(chunked_document)
 
         if IndexMethod.KNOWLEDGE_GRAPH in self.index_methods:
 
             def add_chunk_to_kg(chunk):
-                logger.info("Adding chunk <id: %s> to knowledge graph.", chunk.id)
-                self._kg_index.add_chunk(chunk)
+                with self._kg_extraction_semaphore:
+                    logger.info("Adding chunk <id: %s> to knowledge graph.", chunk.id)
+                    self._kg_index.add_chunk(chunk)
 
             with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
                 list(executor.map(add_chunk_to_kg, chunked_document.chunks))
 
         return chunked_document
 
+    def _get_indexed_document(self, document: Document) -> Optional[Document]:
+        """
+        Get the stored document with the same name, source and content as the
+        document, along with its chunks, return None if it has not been indexed.
+        """
+        source_uri = (document.meta or {}).get("source_uri")
+        for stored_document in self._doc_store.list_by_hash(document.hash):
+            if stored_document.name != document.name:
+                continue
+            if (stored_document.meta or {}).get("source_uri") != source_uri:
+                continue
+            chunks = self._doc_store.list_doc_chunks(stored_document.id)
+            if len(chunks) == 0:
+                continue
+            stored_document.chunks = [
+                Chunk(**c.model_dump(exclude={"document"})) for c in chunks
+            ]
+            return stored_document
+        return None
+
     # Document management.
 
     def add_document(self, document: Document):
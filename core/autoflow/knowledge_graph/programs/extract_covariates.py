@@ -76,10 +76,11 @@ class EntityCovariateExtractor(dspy.Module):
                 input=input_entities,
             )
 
-            output_entity_map = {entity.name: entity for entity in predict.output}
+            covariates_by_name = {e.name: e.covariates for e in predict.output}
             for entity in entities:
-                if entity.name in output_entity_map:
+                covariates = covariates_by_name.get(entity.name)
+                if covariates is not None:
                     # Update the covariates in the metadata of the entity.
-                    entity.meta = output_entity_map[entity.name].covariates
+                    entity.meta = covariates
 
             return entities
@@ -54,6 +54,7 @@ class Autoflow:
         llm: Optional[LLM] = None,
         embedding_model: Optional[EmbeddingModel] = None,
         rerank_model: Optional[RerankModel] = None,
+        kg_extraction_concurrency: Optional[int] = None,
     ):
         return KnowledgeBase(
             db_engine=self.db_engine,
@@ -64,4 +65,5 @@ class Autoflow:
             llm=llm,
             embedding_model=embedding_model,
             rerank_model=rerank_model,
+            kg_extraction_concurrency=kg_extraction_concurrency,
         )
@@ -1,5 +1,8 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Any, List, Optional
-from llama_index.core.bridge.pydantic import Field
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
 from llama_index.core.embeddings import BaseEmbedding
 
 
@@ -56,6 +59,15 @@ class LiteLLMEmbedding(BaseEmbedding):
     timeout: Optional[int] = Field(
         default=60, description="Timeout for each request.", ge=0
     )
+    cache_size: int = Field(
+        default=1024,
+        description="The max number of embeddings cached by text, 0 to disable.",
+        ge=0,
+    )
+
+    # sha256 of text -> embedding, in least recently used order.
+    _cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     def __init__(
         self, model_name: str, *, dimensions: Optional[int] = None, **kwargs
@@ -75,28 +87,27 @@ class LiteLLMEmbedding(BaseEmbedding):
         return self._get_text_embedding(text)
 
     def _get_query_embedding(self, query: str) -> List[float]:
-        embeddings = get_embeddings(
-            api_key=self.api_key,
-            api_base=self.api_base,
-            model_name=self.model_name,
-            dimensions=self.dimensions,
-            timeout=self.timeout,
-            input=[query],
-        )
-        return embeddings[0]
+        return self._get_text_embeddings([query])[0]
 
     def _get_text_embedding(self, text: str) -> List[float]:
-        embeddings = get_embeddings(
-            api_key=self.api_key,
-            api_base=self.api_base,
-            model_name=self.model_name,
-            dimensions=self.dimensions,
-            timeout=self.timeout,
-            input=[text],
-        )
-        return embeddings[0]
+        return self._get_text_embeddings([text])[0]
 
     def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if self.cache_size == 0:
+            return self._embed(texts)
+
+        # Only embed the texts missing in the cache, in a single request.
+        keys = [hashlib.sha256(text.encode("utf-8")).digest() for text in texts]
+        embeddings = self._get_cached_embeddings(keys)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_embeddings = self._embed([texts[i] for i in missing])
+            for i, embedding in zip(missing, missing_embeddings):
+                embeddings[i] = embedding
+            self._cache_embeddings([keys[i] for i in missing], missing_embeddings)
+        return embeddings
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
         return get_embeddings(
             api_key=self.api_key,
             api_base=self.api_base,
@@ -105,3 +116,21 @@ class LiteLLMEmbedding(BaseEmbedding):
             timeout=self.timeout,
             input=texts,
         )
+
+    def _get_cached_embeddings(self, keys: List[bytes]) -> List[Optional[List[float]]]:
+        with self._cache_lock:
+            embeddings = []
+            for key in keys:
+                embedding = self._cache.get(key)
+                if embedding is not None:
+                    self._cache.move_to_end(key)
+                embeddings.append(embedding)
+            return embeddings
+
+    def _cache_embeddings(self, keys: List[bytes], embeddings: List[List[float]]):
+        with self._cache_lock:
+            for key, embedding in zip(keys, embeddings):
+                self._cache[key] = embedding
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -35,6 +35,10 @@ class DocumentStore(ABC):
     def get(self, document_id: UUID) -> Document:
         raise NotImplementedError()
 
+    @abstractmethod
+    def list_by_hash(self, hash: str) -> List[Document]:
+        raise NotImplementedError()
+
     @abstractmethod
     def add_doc_chunks(self, document_id: UUID, chunks: List[Chunk]) -> List[Chunk]:
         raise NotImplementedError()
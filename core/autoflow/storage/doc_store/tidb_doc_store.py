@@ -9,6 +9,7 @@ from pytidb.embeddings import EmbeddingFunction
 from pytidb.schema import TableModel, Field, Column, Relationship as SQLRelationship
 from pytidb.datatype import Vector, JSON
 from pytidb.search import SearchType
+from sqlalchemy import inspect
 from sqlalchemy.dialects.mysql import LONGTEXT
 
 from autoflow.data_types import DataType
@@ -45,7 +46,7 @@ def dynamic_create_models(
 
     # Initialize the document table model.
     class DBDocument(UUIDBaseModel):
-        hash: str = Field(max_length=128)
+        hash: str = Field(max_length=128, index=True)
         name: str = Field(max_length=256)
         content: str = Field(sa_column=Column(LONGTEXT))
         data_type: Optional[DataType] = Field(default=None)
@@ -134,6 +135,23 @@ class TiDBDocumentStore(DocumentStore):
         )
         self._document_table = self._client.create_table(schema=self._document_db_model)
         self._chunk_table = self._client.create_table(schema=self._chunk_db_model)
+        self._migrate_document_indexes()
+
+    def _migrate_document_indexes(self):
+        """
+        Create the indexes of the document table that are missing, create_table
+        skips the tables created before the indexes were declared.
+        """
+        table = self._document_db_model.__table__
+        existing_columns = [
+            index["column_names"]
+            for index in inspect(self._db_engine).get_indexes(table.name)
+        ]
+        for index in table.indexes:
+            columns = [column.name for column in index.columns]
+            if columns not in existing_columns:
+                logger.info("Creating index %s on table %s", index.name, table.name)
+                index.create(self._db_engine, checkfirst=True)
 
     # Document Operations.
 
@@ -184,6 +202,13 @@ class TiDBDocumentStore(DocumentStore):
         db_document = self._document_table.get(document_id)
         return Document(**db_document.model_dump())
 
+    def list_by_hash(self, hash: str) -> List[Document]:
+        """
+        List the documents with the given content hash.
+        """
+        db_documents = self._document_table.query({"hash": hash})
+        return [Document(**d.model_dump()) for d in db_documents]
+
     # TODO: Support pagination.
     def list(self, filters: Dict[str, Any] = None) -> List[Document]:
         """
@@ -254,6 +279,7 @@ class TiDBDocumentStore(DocumentStore):
         """
         Add document chunks.
         """
+        self._embed_chunks(chunks)
         db_chunks = [
             self._chunk_db_model(
                 **c.model_dump(exclude={"document_id"}), document_id=document_id
@@ -263,6 +289,25 @@ class TiDBDocumentStore(DocumentStore):
         db_chunks = self._chunk_table.bulk_insert(db_chunks)
         return [Chunk(**c.model_dump(exclude={"document"})) for c in db_chunks]
 
+    def _embed_chunks(self, chunks: List[Chunk]) -> None:
+        """
+        Embed the chunks without vectors in batches (of the embed_batch_size of the
+        embedding model), the auto embedding of the table would otherwise embed
+        all the chunks of the document in a single request.
+        """
+        if self._embedding_model is None:
+            return
+
+        chunks_to_embed = [c for c in chunks if c.text_vec is None]
+        if len(chunks_to_embed) == 0:
+            return
+
+        vectors = self._embedding_model.get_text_embedding_batch(
+            [c.text for c in chunks_to_embed]
+        )
+        for chunk, vector in zip(chunks_to_embed, vectors):
+            chunk.text_vec = vector
+
     def list_doc_chunks(self, document_id: UUID) -> List[Chunk]:
         """
         List document chunks.
@@ -296,6 +341,7 @@ class TiDBDocumentStore(DocumentStore):
         self._client.drop_table(self._document_table.table_name)
         self._document_table = self._client.create_table(schema=self._document_db_model)
         self._chunk_table = self._client.create_table(schema=self._chunk_db_model)
+        self._migrate_document_indexes()
 
     def reset(self) -> None:
         with self._client.session():
@@ -0,0 +1,7 @@
+from functools import lru_cache
+from importlib import import_module
+
+
+@lru_cache(maxsize=None)
+def import_class(module_name: str, class_name: str) -> type:
+    return getattr(import_module(module_name), class_name)
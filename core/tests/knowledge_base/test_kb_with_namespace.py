@@ -1,7 +1,9 @@
 import logging
+from unittest.mock import Mock
 
 import pytest
 
+from autoflow.chunkers.base import Chunker
 from autoflow.configs.knowledge_base import IndexMethod
 from autoflow.knowledge_base import KnowledgeBase
 
@@ -30,6 +32,29 @@ def test_add_documents_via_filepath(kb: KnowledgeBase):
     assert len(docs) == 1
 
 
+def test_re_add_unchanged_documents(db_engine, llm, embedding_model, monkeypatch):
+    kb = KnowledgeBase(
+        namespace="test_re_add",
+        name="Test re-add",
+        index_methods=[IndexMethod.VECTOR_SEARCH],
+        llm=llm,
+        embedding_model=embedding_model,
+        db_engine=db_engine,
+    )
+    docs = kb.add("./tests/fixtures/tidb-overview.md")
+    assert len(docs) == 1
+
+    chunker = Mock(spec=Chunker)
+    embed = Mock(side_effect=AssertionError("The document is embedded again."))
+    monkeypatch.setattr(type(embedding_model), "get_text_embedding_batch", embed)
+    re_added_docs = kb.add("./tests/fixtures/tidb-overview.md", chunker=chunker)
+
+    chunker.chunk.assert_not_called()
+    embed.assert_not_called()
+    assert [d.id for d in re_added_docs] == [d.id for d in docs]
+    assert len(re_added_docs[0].chunks) > 0
+
+
 def test_add_documents_via_url(kb: KnowledgeBase):
     docs = kb.add("https://docs.pingcap.com/tidbcloud/tidb-cloud-intro")
     assert len(docs) == 1
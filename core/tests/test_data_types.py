@@ -0,0 +1,21 @@
+import pytest
+
+from autoflow.data_types import DataType, guess_datatype
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("docs/README.md", DataType.MARKDOWN),
+        ("report.PDF", DataType.PDF),
+        ("a.html?q=a.csv", DataType.HTML),
+        ("notes.txt?v=a.md", None),
+        ("page.htm#section.csv", DataType.HTML),
+        ("sitemap.xml", DataType.SITEMAP),
+        ("feed.xml", None),
+        ("file:///tmp/data.csv", DataType.CSV),
+        ("https://example.com/index.php?file=a.pdf", DataType.HTML),
+    ],
+)
+def test_guess_datatype(source, expected):
+    assert guess_datatype(source) == expected